@@ -0,0 +1,103 @@
+"""Allocate any number of search assets to search areas for one day, maximizing the probability of detection.
+Generalizes the two searches per day of the menu options to K assets over N areas."""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+import mcs_batch
+
+Allocation = namedtuple('Allocation', 'areas detection')
+
+
+def detection(p, areas, effectiveness):
+    """Return probability of detection sum(p_a * (1 - prod(1 - e_k))) of assets k searching 1-based areas."""
+    p = np.asarray(p, dtype=float)
+    e = np.asarray(effectiveness, dtype=float)
+    areas = np.asarray(areas) - 1
+    e = e[np.arange(len(areas)), areas] if e.ndim == 2 else e
+    miss = np.ones(len(p))
+    np.multiply.at(miss, areas, 1 - e)
+    return float((p * (1 - miss)).sum())
+
+
+def allocate(p, effectiveness):
+    """Return Allocation of assets to 1-based areas with target probabilities p, and its probability of detection.
+
+    effectiveness holds the chance of every asset to detect the sailor in the area it searches,
+    one value per asset or one row of values per area for every asset. For random effectiveness
+    use the means: searches are independent, so the expected probability of detection depends only
+    on them. The probability of detection 1 - prod(1 - e_k) of an area is submodular in the assets
+    searching it, so assets are assigned greedily by the largest gain p_a * miss_a * e_k, where
+    miss_a is the chance that the assets already in area a miss the sailor. This gives at least
+    half of the best allocation, and the best one when all assets are equally effective.
+
+    Gains are kept in a heap with one entry per area, holding its best unassigned asset, so a day
+    costs O((K + N) log N) for K assets of fixed effectiveness and N areas.
+    """
+    p = np.asarray(p, dtype=float)
+    e = np.asarray(effectiveness, dtype=float)
+    num_assets, num_areas = len(e), len(p)
+    assigned = [-1] * num_assets
+    miss = [1.0] * num_areas
+    probs = p.tolist()
+
+    if e.ndim == 1:
+        # Every area has the same best unassigned asset, so take the assets from the most
+        # effective down and put each in the area with the largest p_a * miss_a
+        heap = [(-prob, a) for a, prob in enumerate(probs)]
+        heapq.heapify(heap)
+        values = e.tolist()
+        for k in np.argsort(-e, kind='stable').tolist():
+            _, a = heapq.heappop(heap)
+            assigned[k] = a
+            miss[a] *= 1 - values[k]
+            heapq.heappush(heap, (-probs[a] * miss[a], a))
+    else:
+        # Only the first few assets of every area are ever looked at, so single values are read
+        # from the arrays instead of converting them to lists
+        values = np.ascontiguousarray(e.T)
+        order = np.argsort(-values, axis=1)  # Assets of every area, most effective first
+        best = [0] * num_areas  # Position in order of the best asset of every area that may be unassigned
+        heap = list(zip((-p * values.max(axis=1)).tolist(), range(num_areas)))
+        heapq.heapify(heap)
+        for _ in range(num_assets):
+            while True:
+                _, a = heapq.heappop(heap)
+                i = best[a]
+                while assigned[order[a, i]] >= 0:
+                    i += 1
+                if i == best[a]:
+                    break
+                best[a] = i  # Its best asset went to another area, push the area back with its next one
+                heapq.heappush(heap, (-probs[a] * miss[a] * float(values[a, order[a, i]]), a))
+            k = int(order[a, i])
+            assigned[k] = a
+            miss[a] *= 1 - float(values[a, k])
+            best[a] = i + 1
+            if i + 1 < num_assets:
+                heapq.heappush(heap, (-probs[a] * miss[a] * float(values[a, order[a, i + 1]]), a))
+
+    areas = np.array(assigned) + 1
+    return Allocation(areas, float((p * (1 - np.array(miss))).sum()))
+
+
+class GreedyPolicy:
+    """Batch policy choosing the menu option of the greedy allocation of two assets, for mcs_batch.simulate.
+
+    effectiveness holds the mean effectiveness of the two searches of a day, by default the mean of
+    the uniform daily effectiveness. Ties go to the lowest area.
+    """
+
+    def __init__(self, effectiveness=(np.mean(mcs_batch.EFFECTIVENESS),) * 2):
+        self.effectiveness = np.asarray(effectiveness, dtype=float)
+
+    def __call__(self, p, rng=None):
+        p = np.asarray(p, dtype=float)
+        rows = np.arange(len(p))
+        first_e, second_e = np.sort(self.effectiveness)[::-1]
+        first = p.argmax(axis=1)  # The more effective search goes to the most probable area
+        gain = p * second_e
+        gain[rows, first] *= 1 - first_e
+        second = gain.argmax(axis=1)
+        return np.where(first == second, first + 1, mcs_batch.batch_pair_option(first, second, p.shape[1]))
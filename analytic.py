@@ -0,0 +1,164 @@
+"""Expected number of searches and its distribution computed without sampling sailors.
+
+The probability mass of the sailor not being found yet is propagated day by day over search
+states (searched cells and target probabilities of every area). Every day the effectiveness of
+the searched areas is integrated with the midpoint rule, over nodes x nodes points for two areas
+and over nodes ** 2 points of one area searched twice, and states that round to the same searched
+fraction and target probabilities are merged. E[T] is then the sum over days d of P(T > d).
+"""
+import itertools as it
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+import mcs_batch
+from variance import area_probabilities
+
+Evaluation = namedtuple('Evaluation', 'mean distribution days max_states')
+
+
+class _TieKeys:
+    """Stands in for the generator of mcs_batch.top_areas, giving fixed tie-breaking keys for every row."""
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def random(self, shape):
+        return self.keys
+
+
+def evaluate(policy='once', areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS,
+             effectiveness=mcs_batch.EFFECTIVENESS, sailor_mode=None, nodes=6, levels=200, decimals=3,
+             tol=1e-9, max_days=500, seed=0, cells=None):
+    """Return Evaluation of policy: mean searches, distribution[d - 1] = P(T = d), days and largest number of states.
+
+    levels is the number of searched fraction steps and decimals the rounding of target
+    probabilities used to merge states. States with equal target probabilities are split evenly
+    over every order of the areas for the policies of mcs_batch.POLICIES, which is exactly their
+    random tie-breaking (up to 6 areas). Ties of other policies are broken with a generator
+    seeded with seed.
+    cells are the searchable cells per area, water cells by default like mcs_batch.run_batch.
+    Warns if more than tol of the probability is left after max_days, the mean is then too low.
+    """
+    choose = mcs_batch.POLICIES[policy] if isinstance(policy, str) else policy
+    rng = np.random.default_rng(seed)
+    cells = mcs_batch.scenario_cells(areas, cells).astype(float)
+    num_areas = len(cells)
+    # Keys of top_areas for every order of the areas, used to split states with ties
+    orders = np.array(list(it.permutations(range(num_areas))), dtype=float) if (
+        isinstance(policy, str) and num_areas <= 6) else None
+    options = mcs_batch.menu_areas(num_areas)
+    low, high = effectiveness
+    sep_nodes = low + (high - low) * (np.arange(nodes) + 0.5) / nodes
+    first_sep, second_sep = (a.ravel() for a in np.meshgrid(sep_nodes, sep_nodes, indexing='ij'))
+    combos = len(first_sep)
+    twice_sep = low + (high - low) * (np.arange(combos) + 0.5) / combos  # Finer grid for one area
+    p_steps = 10 ** decimals
+
+    # Every state has searched cells and target probabilities of every area, and the probability
+    # that the sailor is in each area and has not been found with the searches that led there
+    searched = np.zeros((1, num_areas))
+    p = np.array([priors], dtype=float)
+    unfound = np.array([area_probabilities(num_areas, sailor_mode)])
+    survival = [1.0]  # survival[d] = P(T > d)
+    max_states = 1
+    while survival[-1] > tol and len(survival) <= max_days:
+        tied = (np.diff(np.sort(p, axis=1), axis=1) == 0).any(axis=1) if orders is not None else None
+        if tied is not None and tied.any():
+            copies = np.where(tied, len(orders), 1)
+            index = np.repeat(np.arange(len(p)), copies)
+            keys = np.zeros((len(index), num_areas))
+            keys[np.repeat(tied, copies)] = np.tile(orders, (int(tied.sum()), 1))
+            p, searched, unfound = p[index], searched[index], unfound[index] / copies[index, None]
+            choice = choose(p, _TieKeys(keys))
+        elif getattr(choose, 'uses_coverage', False):
+            choice = choose(p, rng, coverage=searched / cells)
+        else:
+            choice = choose(p, rng)
+
+        # Every state continues with every combination of effectiveness of the two searches
+        n = len(p) * combos
+        state = np.repeat(np.arange(len(p)), combos)
+        first, second = options[choice, 0][state], options[choice, 1][state]
+        twice = first == second
+        sep_1 = np.where(twice, np.tile(twice_sep, len(p)), np.tile(first_sep, len(p)))
+        sep_2 = np.where(twice, sep_1, np.tile(second_sep, len(p)))  # Both searches of one area have the same one
+        rows = np.arange(n)
+
+        before = searched[state]
+        after = before.copy()
+        size_1 = np.minimum(np.floor(cells[first] * sep_1), cells[first] - after[rows, first])
+        after[rows, first] += size_1
+        size_2 = np.minimum(np.floor(cells[second] * sep_2), cells[second] - after[rows, second])
+        after[rows, second] += size_2
+
+        # Mass of sailors in the cells searched today is found, uniform over the unsearched cells
+        left = cells - before
+        with np.errstate(invalid='ignore', divide='ignore'):
+            kept = np.where(left > 0, (cells - after) / left, 0.0)
+        remaining = unfound[state] * kept / combos
+
+        # Bayes' rule with the effectiveness used by mcs_batch.simulate
+        used = np.zeros((n, num_areas))
+        used[rows, first] = np.where(twice, (size_1 + size_2) / cells[first], sep_1)
+        used[rows, second] = np.where(twice, used[rows, first], sep_2)
+        searched_today = np.zeros((n, num_areas), dtype=bool)
+        searched_today[rows, first] = True
+        searched_today[rows, second] = True
+        used[(after == cells) & searched_today] = 1.0
+        new_p = p[state] * (1 - used)
+        denom = new_p.sum(axis=1, keepdims=True)
+        new_p = np.where(denom != 0, new_p / np.where(denom != 0, denom, 1), 1.0)
+
+        # Merge states that round to the same searched fractions and target probabilities
+        weight = remaining.sum(axis=1)
+        live = weight > 0
+        if not live.any():
+            survival.append(0.0)  # Every sailor has been found
+            break
+        after, new_p, remaining, weight = after[live], new_p[live], remaining[live], weight[live]
+        key = np.column_stack([np.rint(after / cells * levels), np.rint(new_p * p_steps)]).astype(np.int64)
+        if (levels + 1) ** num_areas * (p_steps + 1) ** num_areas < 2 ** 62:  # One integer per state sorts faster
+            key = key @ np.cumprod([1] + [levels + 1] * num_areas + [p_steps + 1] * (num_areas - 1))
+            _, inverse = np.unique(key, return_inverse=True)
+        else:
+            _, inverse = np.unique(key, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        merged = inverse.max() + 1
+        total = np.bincount(inverse, weight, merged)
+        unfound = np.column_stack([np.bincount(inverse, remaining[:, a], merged) for a in range(num_areas)])
+        searched = np.column_stack([np.bincount(inverse, weight * after[:, a], merged) for a in range(num_areas)])
+        searched = np.floor(searched / total[:, None] + 1e-9)  # Whole cells, like the simulation
+        p = np.column_stack([np.bincount(inverse, weight * new_p[:, a], merged) for a in range(num_areas)])
+        p /= total[:, None]
+        max_states = max(max_states, merged)
+        survival.append(float(unfound.sum()))
+
+    if survival[-1] > tol:
+        warnings.warn(f'Stopped after {max_days} days with {survival[-1]:.3g} probability of the sailor '
+                      f'not found, the mean is too low', RuntimeWarning, stacklevel=2)
+    survival = np.array(survival)
+    return Evaluation(float(survival.sum()), -np.diff(survival), len(survival) - 1, max_states)
+
+
+def cross_check(policy='once', num_trials=200_000, seed=0, areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS,
+                effectiveness=mcs_batch.EFFECTIVENESS, sailor_mode=None, cells=None, **kwargs):
+    """Return (analytic mean, Monte Carlo mean, standard error of the Monte Carlo mean) of the same scenario.
+
+    kwargs are options of evaluate only (nodes, levels, ...).
+    """
+    evaluation = evaluate(policy, areas, priors, effectiveness, sailor_mode, cells=cells, **kwargs)
+    results = mcs_batch.run_batch(num_trials, policy, np.random.default_rng(seed), areas=areas, priors=priors,
+                                  effectiveness=effectiveness, sailor_mode=sailor_mode, cells=cells)
+    return evaluation.mean, float(results.mean()), float(results.std(ddof=1) / np.sqrt(num_trials))
+
+
+def main():
+    for policy in ('once', 'twice'):
+        analytic, simulated, error = cross_check(policy)
+        print(f'{policy}: Average: {analytic:.4f} (Monte Carlo {simulated:.4f} +/- {error:.4f})')
+
+
+if __name__ == '__main__':
+    main()
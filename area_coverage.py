@@ -0,0 +1,43 @@
+"""Keep track of searched coordinates in a search area."""
+import numpy as np
+
+
+class AreaCoverage:
+    """Boolean grid of searched cells in one search area.
+
+    Cells are numbered in the order of it.product(x_range, y_range) and searched in the order
+    of a permutation fixed when the object is created, so every search takes the next
+    unsearched cells after a cursor instead of filtering a list of all coordinates.
+    If valid holds the ids of the cells that can be searched (water), only those are searched
+    and counted in cells.
+    """
+
+    def __init__(self, area_array, shuffle=False, valid=None):
+        self.height, self.width = area_array.shape[:2]
+        valid = np.arange(self.width * self.height) if valid is None else np.asarray(valid)
+        self.cells = len(valid)
+        self.searched = np.zeros((self.width, self.height), dtype=bool)  # Indexed [x, y]
+        self.order = np.random.permutation(valid) if shuffle else valid
+        self.cursor = 0  # Number of searched cells
+
+    @property
+    def exhausted(self):
+        """True when all coordinates have been searched."""
+        return self.cursor == self.cells
+
+    @property
+    def fraction(self):
+        """Return fraction of the area that has been searched."""
+        return self.cursor / self.cells
+
+    def is_searched(self, x, y):
+        """Return True if local coordinates x, y have already been searched."""
+        return bool(self.searched[x, y])
+
+    def search(self, effectiveness_prob):
+        """Search next int(cells * effectiveness_prob) unsearched cells, return their (x, y) coordinates."""
+        stop = min(self.cursor + int(self.cells * effectiveness_prob), self.cells)
+        cells = self.order[self.cursor:stop]
+        self.cursor = stop
+        self.searched.flat[cells] = True
+        return np.column_stack(np.divmod(cells, self.height))
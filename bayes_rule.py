@@ -1,277 +1,257 @@
 import sys, random
-import itertools as it
-import cv2 as cv
 import numpy as np
 
+import map_cache
+import render
+from area_coverage import AreaCoverage
+from decisions import detection_probabilities, menu_options
+from posterior import PosteriorGrid, TargetProbs
+
 MAP_FILE = 'cape.png'
 
 # Define the corners of the three search areas (UL = upper left, LR = lower right)
 SA1_CORNERS = (130, 265, 180, 315)  # (UL-X, UL-Y, LR-X, LR-Y)
 SA2_CORNERS = (80, 255, 130, 305)  # (UL-X, UL-Y, LR-X, LR-Y)
 SA3_CORNERS = (105, 205, 155, 255)  # (UL-X, UL-Y, LR-X, LR-Y)
+SEARCH_AREAS = (SA1_CORNERS, SA2_CORNERS, SA3_CORNERS)
+PRIORS = (0.2, 0.5, 0.3)  # Prior probabilities of sailor in each search area
+EFFECTIVENESS = (0.2, 0.9)  # Range of the uniform actual search effectiveness
+PLANNED_EFFECTIVENESS = (0.1, 0.9)  # Range of the triangular planned search effectiveness
 
 
 class Search:
-    """Bayesian search & rescue game with 3 search areas."""
+    """Bayesian search & rescue game with any number of search areas."""
 
-    def __init__(self, name):
+    def __init__(self, name, headless=False, areas=SEARCH_AREAS, priors=PRIORS, backend=None,
+                 effectiveness=EFFECTIVENESS, planned_effectiveness=PLANNED_EFFECTIVENESS, sailor_mode=None,
+                 drift=None):
         self.name = name
-        self.img = cv.imread(MAP_FILE, cv.IMREAD_COLOR)
-        if self.img is None:
+        self.headless = headless  # Simulate without loading the map or drawing anything
+        self.backend = backend  # Name of the render backend, e.g. 'offscreen' to write frames to files
+        self.base_img = None if headless else map_cache.load_map(MAP_FILE)  # Shared read-only map
+        if self.base_img is None and not headless:
             print('Could not load map file {}'.format(MAP_FILE), file=sys.stderr)
             sys.exit(1)
 
-        self.area_actual = 0
+        self.area_actual = 0  # Search areas are numbered from 1
         self.sailor_actual = [0, 0]  # As "local" coords within search area
+        self.sailor_position = (0, 0)  # Map x, y of the sailor
+        self.drift = drift  # drift.Drift moving the sailor every day, None if the sailor stays put
 
-        self.sa1 = self.img[SA1_CORNERS[1]:SA1_CORNERS[3], SA1_CORNERS[0]:SA1_CORNERS[2]]
-        self.sa2 = self.img[SA2_CORNERS[1]:SA2_CORNERS[3], SA2_CORNERS[0]:SA2_CORNERS[2]]
-        self.sa3 = self.img[SA3_CORNERS[1]:SA3_CORNERS[3], SA3_CORNERS[0]:SA3_CORNERS[2]]
-
-        self.p1 = 0.2
-        self.p2 = 0.5
-        self.p3 = 0.3  # Prior probabilities of sailor in each search area
-
-        self.sep1 = 0  # Search effort in each search area
-        self.sep2 = 0
-        self.sep3 = 0
+        self._img = None  # Private copy of the map, made when something is drawn on it
+        self.corners = tuple(areas)
+        if headless:
+            self.areas = map_cache.blank_areas(self.corners)
+        else:
+            self.areas = map_cache.search_areas(self.base_img, self.corners)
+        # Ids of water cells of every search area, None when the map is not loaded and every cell is water
+        self.water = None if headless else map_cache.water_cells(map_cache.water_mask(MAP_FILE), self.corners)
+
+        self.priors = np.array(priors, dtype=float)
+        self.target = TargetProbs(self.priors)  # Target probabilities of sailor in each search area
+        self.sep = np.zeros(len(self.corners))  # Search effectiveness in each search area
+        self.psep = np.zeros(len(self.corners))  # Planned search effectiveness in each search area
+        self.effectiveness = effectiveness  # (low, high) of calc_search_effectiveness
+        self.planned_effectiveness = planned_effectiveness  # (low, high) of get_psep
+        self.sailor_mode = sailor_mode  # Mode of the triangular sailor area distribution, None for the middle
+
+        # Cell-level target probabilities over the map, or over the search areas when headless
+        shape = self.base_img.shape if self.base_img is not None else (
+            max(c[3] for c in self.corners), max(c[2] for c in self.corners))
+        self.grid = PosteriorGrid(shape, self.corners, self.priors, None if headless else map_cache.water_mask(MAP_FILE))
+
+    @property
+    def p(self):
+        """Return target probabilities of sailor in each search area."""
+        return self.target.probs
+
+    @p.setter
+    def p(self, values):
+        self.target = TargetProbs(values)
+
+    @property
+    def img(self):
+        """Return map image to draw on, copied from the shared map on first use."""
+        if self._img is None and self.base_img is not None:
+            self._img = self.base_img.copy()
+        return self._img
+
+    @property
+    def renderer(self):
+        """Return rendering backend, OpenCV is imported the first time something is drawn."""
+        return render.get_backend(self.backend or ('headless' if self.headless else 'opencv'))
 
     def draw_map(self, last_known):
         """Display basemap with scale, last known xy location, search areas"""
-        cv.line(self.img, (20, 370), (70, 370), (0, 0, 0), 2)  # draw scale line
-        cv.putText(self.img, '0', (8, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-        cv.putText(self.img, '50 Nautical Miles', (71, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-
-        # Draw search areas
-        cv.rectangle(self.img, (SA1_CORNERS[0], SA1_CORNERS[1]), (SA1_CORNERS[2], SA1_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '1', (SA1_CORNERS[0] + 3, SA1_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA2_CORNERS[0], SA2_CORNERS[1]), (SA2_CORNERS[2], SA2_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '2', (SA2_CORNERS[0] + 3, SA2_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA3_CORNERS[0], SA3_CORNERS[1]), (SA3_CORNERS[2], SA3_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '3', (SA3_CORNERS[0] + 3, SA3_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-
-        cv.putText(self.img, '+', last_known, cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '+ = Last Known Position', (274, 355), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '* = Actual Position', (275, 370), cv.FONT_HERSHEY_PLAIN, 1, (255, 0, 0))
-
-        cv.imshow('Search Area', self.img)
-        cv.moveWindow('Search Area', 750, 10)
-        cv.waitKey(1000)
+        if self.base_img is not None:
+            self._img = map_cache.base_layer(MAP_FILE, self.corners, last_known).copy()  # Drawn once, then copied
+        self.renderer.show('Search Area', self.img, 1000, position=(750, 10))
 
     def sailor_final_location(self, num_search_areas):
         """Return the actual x, y location of the missing sailor."""
-        # Find sailor coordinates with respect to any Search Area subarray.
-        self.sailor_actual[0] = np.random.choice(self.sa1.shape[1], 1)
-        self.sailor_actual[1] = np.random.choice(self.sa1.shape[0], 1)
-
-        area = int(random.triangular(1, num_search_areas + 1))
-
-        if area == 1:
-            x = self.sailor_actual[0] + SA1_CORNERS[0]
-            y = self.sailor_actual[1] + SA1_CORNERS[1]
-            self.area_actual = 1
-        elif area == 2:
-            x = self.sailor_actual[0] + SA2_CORNERS[0]
-            y = self.sailor_actual[1] + SA2_CORNERS[1]
-            self.area_actual = 2
-        elif area == 3:
-            x = self.sailor_actual[0] + SA3_CORNERS[0]
-            y = self.sailor_actual[1] + SA3_CORNERS[1]
-            self.area_actual = 3
-        return x, y
+        area = int(random.triangular(1, num_search_areas + 1, self.sailor_mode))
+        self.area_actual = min(area, num_search_areas)
+
+        # Find sailor coordinates with respect to the Search Area subarray.
+        height, width = self.areas[self.area_actual - 1].shape[:2]
+        if self.water is None:
+            self.sailor_actual[0] = int(np.random.choice(width))
+            self.sailor_actual[1] = int(np.random.choice(height))
+        else:  # Only on water
+            self.sailor_actual[:] = divmod(int(np.random.choice(self.water[self.area_actual - 1])), height)
+
+        corners = self.corners[self.area_actual - 1]
+        self.sailor_position = (self.sailor_actual[0] + corners[0], self.sailor_actual[1] + corners[1])
+        return self.sailor_position
+
+    def area_coverages(self, shuffle=False):
+        """Return AreaCoverage of every search area, searching only its water cells."""
+        return [AreaCoverage(area, shuffle, None if self.water is None else self.water[i])
+                for i, area in enumerate(self.areas)]
 
     def calc_search_effectiveness(self):
         """Set decimal search effectiveness value per search area."""
-        self.sep1 = random.uniform(0.2, 0.9)
-        self.sep2 = random.uniform(0.2, 0.9)
-        self.sep3 = random.uniform(0.2, 0.9)
-
-    def conduct_search(self, area_num, area_array, effectiveness_prob, coords_del):
-        """Return search results and list of searched coordinates."""
-        local_y_range = range(area_array.shape[0])
-        local_x_range = range(area_array.shape[1])
-        coords = list(it.product(local_x_range, local_y_range))
-        c = coords
-        coords = [coord for coord in coords if coord not in coords_del]
-        if len(coords) == 0:
-            coords = 1
-        else:
-            random.shuffle(coords)
-            coords = coords[:int(len(c) * effectiveness_prob)]
-        loc_actual = (self.sailor_actual[0], self.sailor_actual[1])
-        if area_num == self.area_actual and loc_actual in coords:
+        self.sep = np.array([random.uniform(*self.effectiveness) for _ in self.corners])
+
+    def conduct_search(self, area_num, coverage, effectiveness_prob):
+        """Return search results and array of coordinates searched this time."""
+        x, y = self.sailor_actual
+        already_searched = area_num == self.area_actual and coverage.is_searched(x, y)
+        coords = coverage.search(effectiveness_prob)
+        if area_num == self.area_actual and not already_searched and coverage.is_searched(x, y):
             return f'Found sailor in Search Area {area_num}!', coords
         else:
+            self.grid.update_area(area_num, coords)  # Searched cells can not contain the sailor
             return 'Not found', coords
 
     def revise_target_probs(self):
         """Update area target probabilities based on search effectiveness."""
-        denom = self.p1 * (1 - self.sep1) + self.p2 * (1 - self.sep2) + self.p3 * (1 - self.sep3)
-        if denom != 0:
-            self.p1 = self.p1 * (1 - self.sep1) / denom
-            self.p2 = self.p2 * (1 - self.sep2) / denom
-            self.p3 = self.p3 * (1 - self.sep3) / denom
-        if denom == 0:
-            self.p1 = 0
-            self.p2 = 0
-            self.p3 = 0
+        self.target.revise(self.sep)
+
+    def drift_target(self):
+        """Move the sailor and the cell target probabilities one day with the drift, update area target probabilities."""
+        x, y = self.drift.move(*self.sailor_position, np.random, self.grid.grid.shape, self.grid.mask)
+        self.sailor_position = (x, y)
+        self.area_actual = 0  # Drifted out of every search area, can not be found there
+        for area_num, c in enumerate(self.corners, start=1):
+            if c[0] <= x < c[2] and c[1] <= y < c[3]:
+                self.area_actual = area_num
+                self.sailor_actual[:] = x - c[0], y - c[1]
+                break
+        self.grid.advance(self.drift)
+        probs = self.grid.area_probs()
+        if probs.sum() > 0:
+            self.p = probs
 
     def get_psep(self):
         """Return random planned search effectiveness probability."""
-        return random.triangular(0.1, 0.9)
+        return random.triangular(*self.planned_effectiveness)
 
     def get_all_psep(self):
         """Return random planned search effectiveness probabilities for all areas."""
-        return self.get_psep(), self.get_psep(), self.get_psep()
+        return np.array([self.get_psep() for _ in self.corners])
 
 
-def draw_menu(search_num, p1, p2, p3):
+def draw_menu(search_num, p):
     """Print menu of choices for conducting area searches, added probability of detection under each option."""
     print(f'\nSearch {search_num}')
-    print(
-        f"""
-        Choose next areas to search:
-        
-        0 - Quit\n
-        1 - Search Area 1 twice
-          Probability of detection = {1 - (1 - p1) ** 2}\n
-        2 - Search Area 2 twice
-          Probability of detection = {1 - (1 - p2) ** 2}\n
-        3 - Search Area 3 twice
-          Probability of detection = {1 - (1 - p3) ** 2}\n
-        4 - Search Area 1 & 2
-          Probability of detection = {p1 + p2}\n
-        5 - Search Area 1 & 3
-          Probability of detection = {p1 + p3}\n
-        6 - Search Area 2 & 3
-          Probability of detection = {p2 + p3}\n
-        7 - Start Over
-        """
-    )
-
-
-
-
-
-def main():
-    app = Search('Cape_Python')
+    lines = ['Choose next areas to search:', '', '0 - Quit\n']
+    options = menu_options(len(p))
+    for choice, ((first, second), pod) in enumerate(zip(options, detection_probabilities(p)), start=1):
+        if first == second:
+            lines.append(f'{choice} - Search Area {first} twice')
+        else:
+            lines.append(f'{choice} - Search Area {first} & {second}')
+        lines.append(f'  Probability of detection = {pod}\n')
+    lines.append(f'{len(options) + 1} - Start Over')
+    print('\n' + '\n'.join(' ' * 8 + line for line in lines) + '\n')
+
+
+def format_values(letter, values):
+    """Return values of all search areas as 'E1 = ..., E2 = ...'."""
+    return ', '.join(f'{letter}{area_num} = {value}' for area_num, value in enumerate(values, start=1))
+
+
+def play(drift=None, backend=None):
+    """Play one game, return when the sailor is found or the player starts over.
+
+    drift is a drift.Drift moving the sailor between searches, backend the name of the render backend.
+    """
+    app = Search('Cape_Python', backend=backend, drift=drift)
     app.draw_map(last_known=(160, 290))
-    sailor_x, sailor_y = app.sailor_final_location(num_search_areas=3)
+    num_areas = len(app.areas)
+    options = menu_options(num_areas)  # Areas searched by each menu option
+    app.sailor_final_location(num_search_areas=num_areas)
     print('-' * 65)
-    app.psep1, app.psep2, app.psep3 = app.get_all_psep()
-    app.p1 *= app.psep1
-    app.p2 *= app.psep2
-    app.p3 *= app.psep3
+    app.psep = app.get_all_psep()
+    app.target.weight(app.psep)
     print('\nSearch Effectiveness Probabilities:')
-    print(f"E1 = {app.psep1}, E2 = {app.psep2}, E3 = {app.psep3}")  # psep = planned search effectiveness probability
+    print(format_values('E', app.psep))  # psep = planned search effectiveness probability
     print('\nTarget (P) Probabilities after taking weather into account:')
-    print(f"P1 = {app.p1}, P2 = {app.p2}, P3 = {app.p3}")
+    print(format_values('P', app.p))
 
     search_num = 1
-    coords_1, coords_2, coords_3 = [], [], []
-    prev_sep1, prev_sep2, prev_sep3 = 0, 0, 0  # Search effectiveness from previous search to remember through the loop
-    """
-    app.sep1 = prev_sep1  # Set search effectiveness for next search to previous search effectiveness
-    prev_sep1 = app.sep1  # Remember current search effectiveness for next search
-    """
+    covers = app.area_coverages(shuffle=True)  # Searched coordinates in each area
+    prev_sep = np.zeros(num_areas)  # Search effectiveness from previous search to remember through the loop
     while True:
         app.calc_search_effectiveness()
-        draw_menu(search_num, app.p1, app.p2, app.p3)
+        draw_menu(search_num, app.p)
         choice = input('Enter choice: ')
 
         if choice == '0':
             sys.exit()
-        elif choice == '1':
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.psep1, coords_1)
-            coords = coords_1
-            results_2, coords_1 = app.conduct_search(1, app.sa1, app.psep1, coords_1)
-            if coords_1 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep1 = 1.0
-            else:
-                app.sep1 = (len(set(coords + coords_1))) / (len(app.sa1)**2)
-            prev_sep1 = app.sep1
-            app.sep2 = prev_sep2
-            app.sep3 = prev_sep3
-        elif choice == '2':
-            results_1, coords_2 = app.conduct_search(2, app.sa2, app.psep2, coords_2)
-            coords = coords_2
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.psep2, coords_2)
-            if coords_2 == 1:
-                app.sep2 = 1.0
-            else:
-                app.sep2 = (len(set(coords + coords_2))) / (len(app.sa2) ** 2)
-            prev_sep2 = app.sep2
-            app.sep1 = prev_sep1
-            app.sep3 = prev_sep3
-        elif choice == '3':
-            results_1, coords_3 = app.conduct_search(3, app.sa3, app.psep3, coords_3)
-            coords = coords_3
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.psep3, coords_3)
-            if coords_3 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep3 = 1.0
-            else:
-                app.sep3 = (len(set(coords + coords_3))) / (len(app.sa3) ** 2)
-            prev_sep3 = app.sep3
-            app.sep1 = prev_sep1
-            app.sep2 = prev_sep2
-        elif choice == '4':
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.psep1, coords_1)
-            if coords_1 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep1 = 1.0
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.psep2, coords_2)
-            if coords_2 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep2 = 1.0
-            prev_sep1 = app.sep1
-            prev_sep2 = app.sep2
-            app.sep3 = prev_sep3
-        elif choice == '5':
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.psep1, coords_1)
-            if coords_1 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep1 = 1.0
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.psep3, coords_3)
-            if coords_3 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep3 = 1.0
-            prev_sep1 = app.sep1
-            prev_sep3 = app.sep3
-            app.sep2 = prev_sep2
-        elif choice == '6':
-            results_1, coords_2 = app.conduct_search(2, app.sa2, app.psep2, coords_2)
-            if coords_2 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep2 = 1.0
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.psep3, coords_3)
-            if coords_3 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep1 = 1.0
-            app.sep1 = prev_sep1
-            prev_sep2 = app.sep2
-            prev_sep3 = app.sep3
-        elif choice == '7':
-            main()
-        else:
+        elif choice == str(len(options) + 1):
+            return
+        elif not choice.isdigit() or not 1 <= int(choice) <= len(options):
             print('Invalid choice. Try again.', file=sys.stderr)
             continue
 
+        first, second = options[int(choice) - 1]
+        cover_1, cover_2 = covers[first - 1], covers[second - 1]
+        results_1, coords_1 = app.conduct_search(first, cover_1, app.psep[first - 1])
+        results_2, coords_2 = app.conduct_search(second, cover_2, app.psep[second - 1])
+
+        sep = prev_sep.copy()  # Areas not searched keep effectiveness of their previous search
+        if first == second:
+            sep[first - 1] = (len(coords_1) + len(coords_2)) / cover_1.cells
+        else:
+            sep[first - 1] = app.sep[first - 1]
+            sep[second - 1] = app.sep[second - 1]
+        for area_num, cover in ((first, cover_1), (second, cover_2)):
+            if cover.exhausted:  # If all coordinates have been searched, set search effectiveness to 1.0
+                sep[area_num - 1] = 1.0
+        app.sep = sep
+        prev_sep = sep
+
         app.revise_target_probs()  # Use BAYES' RULE to update target probabilities
+        if app.drift is not None:  # The sailor drifts before the next search, searched cells may hold it again
+            app.drift_target()
+            covers = app.area_coverages(shuffle=True)
 
         print(f"\nSearch {search_num} Results 1 = {results_1}")
         print(f"Search {search_num} Results 2 = {results_2}\n")
         print(f"Actual Search {search_num} Effectiveness (E):")
-        print(f"E1 = {app.sep1}, E2 = {app.sep2}, E3 = {app.sep3}")
+        print(format_values('E', app.sep))
+        print('Target probabilities from searched cells (G):')
+        print(format_values('G', app.grid.area_probs()))
 
         if results_1 == 'Not found' and results_2 == 'Not found':
-            app.psep1, app.psep2, app.psep3 = app.get_all_psep()
-            app.p1 *= app.psep1
-            app.p2 *= app.psep2
-            app.p3 *= app.psep3
+            app.psep = app.get_all_psep()
+            app.target.weight(app.psep)
             print(f'New Planned Search Effectiveness and Target Probabilities (P) for Search {search_num + 1}:')
-            print(f"E1 = {app.psep1}, E2 = {app.psep2}, E3 = {app.psep3}")
-            print(f"P1 = {app.p1}, P2 = {app.p2}, P3 = {app.p3}")
+            print(format_values('E', app.psep))
+            print(format_values('P', app.p))
         else:
-            cv.circle(app.img, (int(sailor_x), int(sailor_y)), 3, (255, 0, 0), -1)
-            cv.imshow('Search Area', app.img)
-            cv.waitKey(1500)
-            main()
+            app.renderer.circle(app.img, tuple(map(int, app.sailor_position)), 3, (255, 0, 0), -1)
+            app.renderer.show('Search Area', app.img, 1500)
+            return
         search_num += 1
 
 
+def main(drift=None, backend=None):
+    while True:  # New game after every find or start over
+        play(drift, backend)
+
+
 if __name__ == '__main__':
     main()
@@ -1,303 +1,264 @@
 """File version that uses Monte Carlo simulation to choose menu options, based on the best probability
 In loop we check if choosing twice the same area each day is better than searching two areas each day"""
 import sys
-import random
-import itertools as it
-import cv2 as cv
 import numpy as np
 
+import map_cache
+import render
+from area_coverage import AreaCoverage
+from instrument import Profiler, ProgressReporter
+from decisions import menu_options, monte_carlo_twice, monte_carlo_once
+from posterior import PosteriorGrid, TargetProbs
+from stats import RunningStats
+
 MAP_FILE = 'cape.png'
 
 # Define the corners of the three search areas (UL = upper left, LR = lower right)
 SA1_CORNERS = (130, 265, 180, 315)  # (UL-X, UL-Y, LR-X, LR-Y)
 SA2_CORNERS = (80, 255, 130, 305)  # (UL-X, UL-Y, LR-X, LR-Y)
 SA3_CORNERS = (105, 205, 155, 255)  # (UL-X, UL-Y, LR-X, LR-Y)
+SEARCH_AREAS = (SA1_CORNERS, SA2_CORNERS, SA3_CORNERS)
+PRIORS = (0.2, 0.5, 0.3)  # Prior probabilities of sailor in each search area
+EFFECTIVENESS = (0.2, 0.9)  # Range of the uniform daily search effectiveness
 
 
 class Search:
-    """Bayesian search & rescue game with 3 search areas."""
+    """Bayesian search & rescue game with any number of search areas."""
 
-    def __init__(self, name):
+    def __init__(self, name, rng=None, headless=False, areas=SEARCH_AREAS, priors=PRIORS, backend=None,
+                 effectiveness=EFFECTIVENESS, sailor_mode=None, drift=None):
         self.name = name
-        self.img = cv.imread(MAP_FILE, cv.IMREAD_COLOR)
-        if self.img is None:
+        self.headless = headless  # Simulate without loading the map or drawing anything
+        self.backend = backend  # Name of the render backend, e.g. 'offscreen' to write frames to files
+        self.rng = np.random.default_rng() if rng is None else rng  # Random generator for reproducible runs
+        self.base_img = None if headless else map_cache.load_map(MAP_FILE)  # Shared read-only map
+        if self.base_img is None and not headless:
             print('Could not load map file {}'.format(MAP_FILE), file=sys.stderr)
             sys.exit(1)
 
-        self.area_actual = 0
+        self.area_actual = 0  # Search areas are numbered from 1
         self.sailor_actual = [0, 0]  # As "local" coords within search area
+        self.sailor_position = (0, 0)  # Map x, y of the sailor
+        self.drift = drift  # drift.Drift moving the sailor every day, None if the sailor stays put
 
-        self.sa1 = self.img[SA1_CORNERS[1]:SA1_CORNERS[3], SA1_CORNERS[0]:SA1_CORNERS[2]]
-        self.sa2 = self.img[SA2_CORNERS[1]:SA2_CORNERS[3], SA2_CORNERS[0]:SA2_CORNERS[2]]
-        self.sa3 = self.img[SA3_CORNERS[1]:SA3_CORNERS[3], SA3_CORNERS[0]:SA3_CORNERS[2]]
-
-        self.p1 = 0.2
-        self.p2 = 0.5
-        self.p3 = 0.3  # Prior probabilities of sailor in each search area
-
-        self.sep1 = 0  # Search effort in each search area
-        self.sep2 = 0
-        self.sep3 = 0
+        self._img = None  # Private copy of the map, made when something is drawn on it
+        self.corners = tuple(areas)
+        if headless:
+            self.areas = map_cache.blank_areas(self.corners)
+        else:
+            self.areas = map_cache.search_areas(self.base_img, self.corners)
+        # Ids of water cells of every search area, None when the map is not loaded and every cell is water
+        self.water = None if headless else map_cache.water_cells(map_cache.water_mask(MAP_FILE), self.corners)
+
+        self.priors = np.array(priors, dtype=float)
+        self.target = TargetProbs(self.priors)  # Target probabilities of sailor in each search area
+        self.sep = np.zeros(len(self.corners))  # Search effectiveness in each search area
+        self.effectiveness = effectiveness  # (low, high) of calc_search_effectiveness
+        self.sailor_mode = sailor_mode  # Mode of the triangular sailor area distribution, None for the middle
+
+        # Cell-level target probabilities, only needed to move them with the drift
+        self.grid = None
+        if drift is not None:
+            shape = self.base_img.shape if self.base_img is not None else (
+                max(c[3] for c in self.corners), max(c[2] for c in self.corners))
+            self.grid = PosteriorGrid(shape, self.corners, self.priors, None if headless else map_cache.water_mask(MAP_FILE))
+
+    @property
+    def p(self):
+        """Return target probabilities of sailor in each search area."""
+        return self.target.probs
+
+    @p.setter
+    def p(self, values):
+        self.target = TargetProbs(values)
+
+    @property
+    def img(self):
+        """Return map image to draw on, copied from the shared map on first use."""
+        if self._img is None and self.base_img is not None:
+            self._img = self.base_img.copy()
+        return self._img
+
+    @property
+    def renderer(self):
+        """Return rendering backend, OpenCV is imported the first time something is drawn."""
+        return render.get_backend(self.backend or ('headless' if self.headless else 'opencv'))
 
     def draw_map(self, last_known):
         """Display basemap with scale, last known xy location, search areas"""
-        cv.line(self.img, (20, 370), (70, 370), (0, 0, 0), 2)  # draw scale line
-        cv.putText(self.img, '0', (8, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-        cv.putText(self.img, '50 Nautical Miles', (71, 370), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 0))
-
-        # Draw search areas
-        cv.rectangle(self.img, (SA1_CORNERS[0], SA1_CORNERS[1]), (SA1_CORNERS[2], SA1_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '1', (SA1_CORNERS[0] + 3, SA1_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA2_CORNERS[0], SA2_CORNERS[1]), (SA2_CORNERS[2], SA2_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '2', (SA2_CORNERS[0] + 3, SA2_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-        cv.rectangle(self.img, (SA3_CORNERS[0], SA3_CORNERS[1]), (SA3_CORNERS[2], SA3_CORNERS[3]), (0, 0, 0), 1)
-        cv.putText(self.img, '3', (SA3_CORNERS[0] + 3, SA3_CORNERS[1] + 15), cv.FONT_HERSHEY_PLAIN, 1, 0)
-
-        cv.putText(self.img, '+', last_known, cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '+ = Last Known Position', (274, 355), cv.FONT_HERSHEY_PLAIN, 1, (0, 0, 255))
-        cv.putText(self.img, '* = Actual Position', (275, 370), cv.FONT_HERSHEY_PLAIN, 1, (255, 0, 0))
-
-        cv.imshow('Search Area', self.img)
-        cv.moveWindow('Search Area', 750, 10)
-        cv.waitKey(1000)
+        if self.base_img is not None:
+            self._img = map_cache.base_layer(MAP_FILE, self.corners, last_known).copy()  # Drawn once, then copied
+        self.renderer.show('Search Area', self.img, 1000, position=(750, 10))
 
     def sailor_final_location(self, num_search_areas):
         """Return the actual x, y location of the missing sailor."""
-        # Find sailor coordinates with respect to any Search Area subarray.
-        self.sailor_actual[0] = np.random.choice(self.sa1.shape[1], 1)
-        self.sailor_actual[1] = np.random.choice(self.sa1.shape[0], 1)
-
-        area = int(random.triangular(1, num_search_areas + 1))
-
-        if area == 1:
-            x = self.sailor_actual[0] + SA1_CORNERS[0]
-            y = self.sailor_actual[1] + SA1_CORNERS[1]
-            self.area_actual = 1
-        elif area == 2:
-            x = self.sailor_actual[0] + SA2_CORNERS[0]
-            y = self.sailor_actual[1] + SA2_CORNERS[1]
-            self.area_actual = 2
-        elif area == 3:
-            x = self.sailor_actual[0] + SA3_CORNERS[0]
-            y = self.sailor_actual[1] + SA3_CORNERS[1]
-            self.area_actual = 3
-        return x, y
+        mode = (num_search_areas + 2) / 2 if self.sailor_mode is None else self.sailor_mode
+        area = int(self.rng.triangular(1, mode, num_search_areas + 1))
+        self.area_actual = min(area, num_search_areas)
+
+        # Find sailor coordinates with respect to the Search Area subarray.
+        height, width = self.areas[self.area_actual - 1].shape[:2]
+        if self.water is None:
+            self.sailor_actual[0] = int(self.rng.integers(width))
+            self.sailor_actual[1] = int(self.rng.integers(height))
+        else:  # Only on water
+            water = self.water[self.area_actual - 1]
+            self.sailor_actual[:] = divmod(int(water[self.rng.integers(len(water))]), height)
+
+        corners = self.corners[self.area_actual - 1]
+        self.sailor_position = (self.sailor_actual[0] + corners[0], self.sailor_actual[1] + corners[1])
+        return self.sailor_position
+
+    def area_coverages(self, shuffle=False):
+        """Return AreaCoverage of every search area, searching only its water cells."""
+        return [AreaCoverage(area, shuffle, None if self.water is None else self.water[i])
+                for i, area in enumerate(self.areas)]
 
     def calc_search_effectiveness(self):
         """Set decimal search effectiveness value per search area."""
-        self.sep1 = random.uniform(0.2, 0.9)
-        self.sep2 = random.uniform(0.2, 0.9)
-        self.sep3 = random.uniform(0.2, 0.9)
-
-    def conduct_search(self, area_num, area_array, effectiveness_prob, coords_del):
-        """Return search results and list of searched coordinates."""
-        local_y_range = range(area_array.shape[0])
-        local_x_range = range(area_array.shape[1])
-        coords = list(it.product(local_x_range, local_y_range))
-        c = list(it.product(local_x_range, local_y_range))
-        coords = [coord for coord in coords if coord not in coords_del]
-        if len(coords) == 0:
-            coords = 1
-        else:
-            coords = coords[:int(len(c) * effectiveness_prob)]
-        loc_actual = (self.sailor_actual[0], self.sailor_actual[1])
-        if area_num == self.area_actual and loc_actual in coords:
+        self.sep = self.rng.uniform(*self.effectiveness, len(self.corners))
+
+    def conduct_search(self, area_num, coverage, effectiveness_prob):
+        """Return search results and array of coordinates searched this time."""
+        x, y = self.sailor_actual
+        already_searched = area_num == self.area_actual and coverage.is_searched(x, y)
+        coords = coverage.search(effectiveness_prob)
+        if area_num == self.area_actual and not already_searched and coverage.is_searched(x, y):
             return f'Found sailor in Search Area {area_num}!', coords
         else:
+            if self.grid is not None:
+                self.grid.update_area(area_num, coords)  # Searched cells can not contain the sailor
             return 'Not found', coords
 
     def revise_target_probs(self):
         """Update area target probabilities based on search effectiveness."""
-        denom = self.p1 * (1 - self.sep1) + self.p2 * (1 - self.sep2) + self.p3 * (1 - self.sep3)
-        if denom != 0:
-            self.p1 = self.p1 * (1 - self.sep1) / denom
-            self.p2 = self.p2 * (1 - self.sep2) / denom
-            self.p3 = self.p3 * (1 - self.sep3) / denom
-        if denom == 0:
-            self.p1 = 1
-            self.p2 = 1
-            self.p3 = 1
+        self.target.revise(self.sep)
+
+    def drift_target(self):
+        """Move the sailor and the cell target probabilities one day with the drift, update area target probabilities."""
+        x, y = self.drift.move(*self.sailor_position, self.rng, self.grid.grid.shape, self.grid.mask)
+        self.sailor_position = (x, y)
+        self.area_actual = 0  # Drifted out of every search area, can not be found there
+        for area_num, c in enumerate(self.corners, start=1):
+            if c[0] <= x < c[2] and c[1] <= y < c[3]:
+                self.area_actual = area_num
+                self.sailor_actual[:] = x - c[0], y - c[1]
+                break
+        self.grid.advance(self.drift)
+        probs = self.grid.area_probs()
+        if probs.sum() > 0:
+            self.p = probs
+
     def reset_target_probs(self):
         """Reset area target probabilities."""
-        self.p1 = 0.2
-        self.p2 = 0.5
-        self.p3 = 0.3
+        self.p = self.priors.copy()
 
-def draw_menu(search_num):
+
+def draw_menu(search_num, num_areas=len(SEARCH_AREAS)):
     """Print menu of choices for conducting area searches."""
     print(f'\nSearch {search_num}')
-    print(
-        """
-        Choose next areas to search:
-        
-        0 - Quit
-        1 - Search Area 1 twice
-        2 - Search Area 2 twice
-        3 - Search Area 3 twice
-        4 - Search Area 1 & 2
-        5 - Search Area 1 & 3
-        6 - Search Area 2 & 3
-        7 - Start Over
-        """
-    )
-
-
-def monte_carlo_twice(p1, p2, p3):
-    """Return the area with the highest probability of containing the sailor."""
-    if p1 > p2 and p1 > p3:
-        choice = 1
-        return choice
-    elif p2 > p1 and p2 > p3:
-        choice = 2
-        return choice
-    elif p3 > p1 and p3 > p2:
-        choice = 3
-        return choice
-    elif p1 == p2 and p1 > p3:
-        choice = random.choice([1, 2])
-        return choice
-    elif p1 == p3 and p1 > p2:
-        choice = random.choice([1, 3])
-        return choice
-    elif p2 == p3 and p2 > p1:
-        choice = random.choice([2, 3])
-        return choice
-    elif p1 == p2 == p3:
-        choice = random.choice([1, 2, 3])
-        return choice
-
-
-def monte_carlo_once(p1, p2, p3):
-    """Return two areas with the highest probability of containing the sailor."""
-    if (p1 > p3) and (p2 > p3):
-        choice = 4
-        return choice
-    elif (p1 > p2) and (p3 > p2):
-        choice = 5
-        return choice
-    elif (p2 > p1) and (p3 > p1):
-        choice = 6
-        return choice
-    elif p1 == p2 == p3:
-        choice = random.choice([4, 5, 6])
-        return choice
-    elif p1 == p2 and p1 > p3:
-        choice = 4
-        return choice
-    elif p1 == p3 and p1 > p2:
-        choice = 5
-        return choice
-    elif p2 == p3 and p2 > p1:
-        choice = 6
-        return choice
-    elif p1 == p2 and p1 < p3:
-        choice = random.choice([5, 6])
-        return choice
-    elif p1 == p3 and p1 < p2:
-        choice = random.choice([4, 6])
-        return choice
-    elif p2 == p3 and p2 < p1:
-        choice = random.choice([4, 5])
-        return choice
-
-
-search_results = []
-
-
-def main():
-    app = Search('Cape_Python') # Create instance of Search class
-    app.draw_map(last_known=(160, 290)) # Draw map with last known location
-    sailor_x, sailor_y = app.sailor_final_location(num_search_areas=3) # Generate sailor's final location
-    search_num = 1
-    i = 1  # Counter for number of searches
-    coords_1, coords_2, coords_3 = [], [], [] # List of coordinates searched in each area
-    app.sep1, app.sep2, app.sep3 = 0, 0, 0  # Current search effectiveness
-    prev_sep1, prev_sep2, prev_sep3 = 0, 0, 0  # Search effectiveness from previous search to remember through the loop
-    """
-    app.sep1 = prev_sep1  # Set search effectiveness for next search to previous search effectiveness
-    """
-    while i <= 10000:
+    lines = ['Choose next areas to search:', '', '0 - Quit']
+    options = menu_options(num_areas)
+    for choice, (first, second) in enumerate(options, start=1):
+        if first == second:
+            lines.append(f'{choice} - Search Area {first} twice')
+        else:
+            lines.append(f'{choice} - Search Area {first} & {second}')
+    lines.append(f'{len(options) + 1} - Start Over')
+    print('\n' + '\n'.join(' ' * 8 + line for line in lines) + '\n')
 
-        app.calc_search_effectiveness()
-        # choice = monte_carlo_twice(app.p1, app.p2, app.p3)  # Choose area to search twice Average: 2.0935
-        choice= monte_carlo_once(app.p1, app.p2, app.p3)  # Choose two areas to search once Average: 1.9644
-
-        if choice == 0:
-            sys.exit(0)
-        elif choice == 1:
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, coords_1)
-            coords = coords_1
-            results_2, coords_1 = app.conduct_search(1, app.sa1, app.sep1, coords_1)
-            if coords_1 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep1 = 1.0
-            else:
-                app.sep1 = (len(set(coords + coords_1))) / (len(app.sa1)**2)
-            app.sep2 = prev_sep2
-            app.sep3 = prev_sep3
-        elif choice == 2:
-            results_1, coords_2 = app.conduct_search(2, app.sa2, app.sep2, coords_2)
-            coords = coords_2
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, coords_2)
-            if coords_2 == 1:
-                app.sep2 = 1.0
-            else:
-                app.sep2 = (len(set(coords + coords_2))) / (len(app.sa2) ** 2)
-            app.sep1 = prev_sep1
-            app.sep3 = prev_sep3
-        elif choice == 3:
-            results_1, coords_3 = app.conduct_search(3, app.sa3, app.sep3, coords_3)
-            coords = coords_3
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.sep3, coords_3)
-            if coords_3 == 1:  # If all coordinates have been searched, set search effectiveness to 1.0
-                app.sep3 = 1.0
-            else:
-                app.sep3 = (len(set(coords + coords_3))) / (len(app.sa3) ** 2)
-            app.sep1 = prev_sep1
-            app.sep2 = prev_sep2
-        elif choice == 4:
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, coords_1)
-            if coords_1 == 1:
-                app.sep1 = 1.0
-            results_2, coords_2 = app.conduct_search(2, app.sa2, app.sep2, coords_2)
-            if coords_2 == 1:
-                app.sep2 = 1.0
-
-            app.sep3 = prev_sep3
-        elif choice == 5:
-            results_1, coords_1 = app.conduct_search(1, app.sa1, app.sep1, coords_1)
-            if coords_1 == 1:
-                app.sep1 = 1.0
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.sep3, coords_3)
-            if coords_3 == 1:
-                app.sep3 = 1.0
-            app.sep2 = prev_sep2
-        elif choice == 6:
-            results_1, coords_2 = app.conduct_search(2, app.sa2, app.sep2, coords_2)
-            if coords_2 == 1:
-                app.sep2 = 1.0
-            results_2, coords_3 = app.conduct_search(3, app.sa3, app.sep3, coords_3)
-            if coords_3 == 1:
-                app.sep3 = 1.0
-            app.sep1 = prev_sep1
-
-        if results_1 == 'Not found' and results_2 == 'Not found':
-            search_num += 1
-            app.revise_target_probs()  # Use BAYES' RULE to update target probabilities
 
+def run_trial(app, rng, policy=monte_carlo_once, max_searches=None):
+    """Search for the sailor of app with menu options chosen by policy, return number of searches needed.
+
+    A drifting sailor may leave every search area, so searches can be capped at max_searches,
+    which is returned when the sailor has not been found by then.
+    """
+    num_areas = len(app.areas)
+    options = menu_options(num_areas)  # Areas searched by each menu option
+    covers = app.area_coverages()  # Searched coordinates in each area
+    search_num = 1
+    while True:
+        app.calc_search_effectiveness()
+        choice = policy(*app.p, rng=rng)
+
+        first, second = options[choice - 1]
+        cover_1, cover_2 = covers[first - 1], covers[second - 1]
+        results_1, coords_1 = app.conduct_search(first, cover_1, app.sep[first - 1])
+        results_2, coords_2 = app.conduct_search(second, cover_2, app.sep[second - 1])
+        if results_1 != 'Not found' or results_2 != 'Not found':
+            return search_num
+
+        sep = np.zeros(num_areas)  # Areas not searched today do not change target probabilities
+        if first == second:
+            sep[first - 1] = (len(coords_1) + len(coords_2)) / cover_1.cells
         else:
-            search_results.append(search_num)  # Add search number to list
-            print(f'I: {i}')
-            i += 1
-            app = Search('Cape_Python') # Make new instance of Search class
-            sailor_x, sailor_y = app.sailor_final_location(num_search_areas=3)  # Generate next sailor's final location
-            search_num = 1  # Reset search number
-            coords_1, coords_2, coords_3 = [], [], []  # Make coords list empty for next search
-            app.sep1, app.sep2, app.sep3 = 0, 0, 0 # Reset search effectiveness
-            prev_sep1, prev_sep2, prev_sep3 = 0, 0, 0 # Reset previous search effectiveness
-    average = sum(search_results) / len(search_results)  # Calculate average number of searches
-    print(f'Average: {average}')
+            sep[first - 1] = app.sep[first - 1]
+            sep[second - 1] = app.sep[second - 1]
+        for area_num, cover in ((first, cover_1), (second, cover_2)):
+            if cover.exhausted:  # If all coordinates have been searched, set search effectiveness to 1.0
+                sep[area_num - 1] = 1.0
+        app.sep = sep
+        app.revise_target_probs()  # Use BAYES' RULE to update target probabilities
+        if app.drift is not None:  # The sailor drifts before the next search, searched cells may hold it again
+            app.drift_target()
+            covers = app.area_coverages()
+        if search_num == max_searches:
+            return search_num
+        search_num += 1
+
+
+def main(seed=None, headless=False, num_trials=10000, snapshot_file=None, snapshot_every=1000,
+         profile_file=None, sample_every=10, progress_every=5.0, drift=None, max_searches=100):
+    """Simulate num_trials searches, writing stats to snapshot_file every snapshot_every trials if given.
+
+    With drift (drift.Drift) the sailor and the target probabilities move every day and a trial
+    ends after max_searches searches even if the sailor has not been found.
+
+    With profile_file, time spent in map loading, Search methods and trials is sampled every
+    sample_every calls and written to profile_file as JSON. Progress is printed every progress_every seconds.
+    """
+    profiler = Profiler(sample_every)
+    if profile_file is not None:
+        profiler.instrument(map_cache, 'load_map')
+        profiler.instrument(Search, '__init__', 'sailor_final_location', 'calc_search_effectiveness',
+                            'conduct_search', 'revise_target_probs')
+        profiler.instrument(AreaCoverage, 'search')
+        profiler.instrument(sys.modules[__name__], 'run_trial')
+    with profiler:
+        search_stats = _run_trials(seed, headless, num_trials, snapshot_file, snapshot_every, progress_every, profiler,
+                                   drift, max_searches if drift is not None else None)
+    if profile_file is not None:
+        profiler.export(profile_file)
+    print(f'Average: {search_stats.mean}')  # Average number of searches
+    print(f'Standard deviation: {search_stats.std}, median: {search_stats.percentile(50)}, '
+          f'90th percentile: {search_stats.percentile(90)}, max: {search_stats.max}')
     sys.exit(0)
 
 
+def _run_trials(seed, headless, num_trials, snapshot_file, snapshot_every, progress_every, profiler,
+                drift=None, max_searches=None):
+    """Return RunningStats of num_trials simulated searches."""
+    rng = np.random.default_rng(seed)  # One random stream for the whole run, same seed gives same results
+    app = Search('Cape_Python', rng, headless, drift=drift) # Create instance of Search class
+    app.draw_map(last_known=(160, 290)) # Draw map with last known location
+    search_stats = RunningStats()  # Number of searches needed to find the sailor
+    progress = ProgressReporter(num_trials, progress_every)
+    for i in range(1, num_trials + 1):
+        if i > 1:
+            app = Search('Cape_Python', rng, headless, drift=drift) # Make new instance of Search class
+        app.sailor_final_location(num_search_areas=len(app.areas)) # Generate sailor's final location
+        # search_num = run_trial(app, rng, monte_carlo_twice)  # Choose area to search twice Average: 1.99
+        search_num = run_trial(app, rng, monte_carlo_once, max_searches)  # Choose two areas to search once Average: 1.88
+        search_stats.add(search_num)  # Add search number to statistics
+        profiler.count('search_days', search_num)
+        if snapshot_file is not None and i % snapshot_every == 0:
+            search_stats.save(snapshot_file)
+        progress.update(i)
+    if snapshot_file is not None:
+        search_stats.save(snapshot_file)
+    return search_stats
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,157 @@
+"""Benchmarks of the Search hot paths and of whole-trial throughput.
+
+Run from anywhere:
+    python benchmarks/bench_search.py --save       # write benchmarks/baseline.json
+    python benchmarks/bench_search.py              # compare with the saved baseline
+Exit status is 1 when a benchmark is slower than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+import bayes_rule_MCS  # noqa: E402
+import mcs_batch  # noqa: E402
+from area_coverage import AreaCoverage  # noqa: E402
+from decisions import monte_carlo_once, monte_carlo_twice  # noqa: E402
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+AREA_COUNTS = (3, 30, 300)
+AREA_SIZES = (50, 200)
+COVERAGE_LEVELS = (0.0, 0.25, 0.5, 0.75)
+
+
+def make_areas(count, size=50):
+    """Return count square search areas of size cells per side laid out in rows, and their priors."""
+    per_row = int(np.ceil(np.sqrt(count)))
+    areas = [((i % per_row) * size, (i // per_row) * size, (i % per_row + 1) * size, (i // per_row + 1) * size)
+             for i in range(count)]
+    priors = np.random.default_rng(0).uniform(0.5, 1.5, count)
+    return areas, priors / priors.sum()
+
+
+def per_call(fn, min_time=0.2):
+    """Return best seconds per call of fn over five repeats of enough calls to run min_time."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def bench_init(results):
+    os.chdir(ROOT)  # Search loads MAP_FILE relative to the working directory
+    for count in AREA_COUNTS:
+        areas, priors = make_areas(count)
+        results[f'search_init/headless/areas={count}'] = per_call(
+            lambda: bayes_rule_MCS.Search('bench', headless=True, areas=areas, priors=priors))
+    results['search_init/map/areas=3'] = per_call(lambda: bayes_rule_MCS.Search('bench'))
+
+
+def bench_conduct_search(results):
+    """Time one search of 10 % of an area after the area has been covered to each level."""
+    app = bayes_rule_MCS.Search('bench', np.random.default_rng(0), headless=True)
+    for size in AREA_SIZES:
+        area = np.zeros((size, size, 3), dtype=np.uint8)
+        for level in COVERAGE_LEVELS:
+            times = []
+            for _ in range(50):
+                cover = AreaCoverage(area, shuffle=True)
+                cover.search(level)
+                start = time.perf_counter()
+                app.conduct_search(1, cover, 0.1)
+                times.append(time.perf_counter() - start)
+            results[f'conduct_search/size={size}/coverage={level}'] = statistics.median(times)
+
+
+def bench_revise(results):
+    for count in AREA_COUNTS:
+        areas, priors = make_areas(count)
+        app = bayes_rule_MCS.Search('bench', np.random.default_rng(0), headless=True, areas=areas, priors=priors)
+        app.calc_search_effectiveness()
+        results[f'revise_target_probs/areas={count}'] = per_call(app.revise_target_probs)
+
+
+def bench_decisions(results):
+    for count in AREA_COUNTS:
+        _, priors = make_areas(count)
+        p = [float(v) for v in priors]
+        results[f'monte_carlo_once/areas={count}'] = per_call(lambda: monte_carlo_once(*p))
+        results[f'monte_carlo_twice/areas={count}'] = per_call(lambda: monte_carlo_twice(*p))
+        rows = np.tile(priors, (10_000, 1))
+        rng = np.random.default_rng(0)
+        results[f'batch_monte_carlo_once/areas={count}'] = per_call(
+            lambda: mcs_batch.batch_monte_carlo_once(rows, rng)) / len(rows)
+
+
+def bench_trials(results):
+    """Time whole trials, reported per trial so that lower is better like every other benchmark."""
+    rng = np.random.default_rng(0)
+    for count in AREA_COUNTS[:2]:
+        areas, priors = make_areas(count)
+
+        def scalar_trial():
+            app = bayes_rule_MCS.Search('bench', rng, headless=True, areas=areas, priors=priors)
+            app.sailor_final_location(num_search_areas=count)
+            bayes_rule_MCS.run_trial(app, rng, monte_carlo_twice)
+
+        results[f'trial/scalar/areas={count}'] = per_call(scalar_trial)
+        num_trials = 100_000
+        results[f'trial/batch/areas={count}'] = per_call(
+            lambda: mcs_batch.run_batch(num_trials, 'twice', rng, areas=areas, priors=priors), 1.0) / num_trials
+
+
+BENCHMARKS = (bench_init, bench_conduct_search, bench_revise, bench_decisions, bench_trials)
+
+
+def run():
+    """Return dict of benchmark name -> seconds per operation."""
+    results = {}
+    for bench in BENCHMARKS:
+        bench(results)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return names of benchmarks more than threshold (fraction) slower than baseline."""
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--save', action='store_true', help='save results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 = 25 %%')
+    args = parser.parse_args()
+
+    results = run()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    for name, seconds in results.items():
+        rate = f'{1 / seconds:14,.0f} /s'
+        change = f'{seconds / baseline[name] - 1:+7.1%}' if name in baseline else ''
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:45} {seconds * 1e6:12.2f} us {rate} {change}{flag}')
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__,
+                       'machine': platform.machine(), 'results': results}, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Measure how long a fresh interpreter takes to import the simulation with and without OpenCV.
+Run from the repository root: python benchmarks/startup.py"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    'bare interpreter': 'pass',
+    'decision functions': 'from decisions import monte_carlo_once, monte_carlo_twice',
+    'headless simulation core': 'import bayes_rule_MCS',
+    'headless Search': "import bayes_rule_MCS; bayes_rule_MCS.Search('x', headless=True)",
+    'with OpenCV backend': "import bayes_rule_MCS, render; render.get_backend('opencv')",
+}
+
+
+def time_import(code, repeat):
+    """Return median wall time in seconds of running code in a new interpreter."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(repeat=10):
+    base = None
+    for name, code in CASES.items():
+        seconds = time_import(code, repeat)
+        if base is None:
+            base = seconds
+        print(f'{name:32} {seconds * 1000:8.1f} ms  (+{(seconds - base) * 1000:.1f} ms over bare interpreter)')
+
+
+if __name__ == '__main__':
+    main()
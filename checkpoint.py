@@ -0,0 +1,82 @@
+"""Monte Carlo campaigns that save their progress and can be resumed or extended.
+
+Trials are run in whole blocks of block_size, and block i always uses the random stream
+SeedSequence(entropy, spawn_key=(i,)). The random state of a campaign is therefore only its
+seed entropy and the number of finished blocks, which are saved after every batch of blocks
+together with the configuration and the statistics so far. A resumed or extended campaign gives
+exactly the same statistics as one uninterrupted run (and as parallel.run_parallel with the same
+seed when the number of trials is a multiple of block_size).
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import mcs_batch
+from parallel import BLOCK_SIZE, run_block
+from stats import RunningStats
+
+
+def save_checkpoint(path, config, blocks_done, search_stats):
+    """Write campaign state to path, replacing the previous checkpoint atomically."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, config=np.array(json.dumps(config)), blocks_done=np.array(blocks_done),
+                 **search_stats.to_arrays())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """Return config, number of finished blocks and RunningStats saved in path."""
+    with np.load(path) as data:
+        return json.loads(str(data['config'])), int(data['blocks_done']), RunningStats.from_arrays(data)
+
+
+def run_campaign(path, num_trials, policy='once', seed=None, block_size=BLOCK_SIZE, workers=1,
+                 areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS):
+    """Run campaign until it has at least num_trials trials, return its RunningStats.
+
+    If path holds a checkpoint, the campaign continues from it with the saved configuration, so
+    calling again with a larger num_trials extends a finished campaign. policy must be a name from
+    mcs_batch.POLICIES so that it can be saved.
+    """
+    if os.path.exists(path):
+        config, blocks_done, search_stats = load_checkpoint(path)
+        requested = {'policy': policy, 'block_size': block_size}
+        if seed is not None:
+            requested['seed'] = seed
+        for key, value in requested.items():
+            if config[key] != value:
+                raise ValueError(f'Checkpoint {path} has {key}={config[key]!r}, not {value!r}')
+    else:
+        config = {
+            'policy': policy,
+            'seed': np.random.SeedSequence(seed).entropy if seed is None else seed,
+            'block_size': block_size,
+            'areas': [list(c) for c in areas],
+            'priors': list(priors),
+        }
+        blocks_done, search_stats = 0, RunningStats()
+        save_checkpoint(path, config, blocks_done, search_stats)
+
+    total_blocks = -(-num_trials // config['block_size'])  # Whole blocks only
+    workers = workers or os.cpu_count()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while blocks_done < total_blocks:
+            wave = range(blocks_done, min(blocks_done + workers, total_blocks))
+            seeds = [np.random.SeedSequence(config['seed'], spawn_key=(i,)) for i in wave]
+            n = len(wave)
+            args = (seeds, [config['block_size']] * n, [config['policy']] * n, [config['areas']] * n,
+                    [config['priors']] * n)
+            for block in (pool.map(run_block, *args) if pool else map(run_block, *args)):
+                search_stats.merge(block)  # Merged in block order like an uninterrupted run
+            blocks_done = wave.stop
+            save_checkpoint(path, config, blocks_done, search_stats)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return search_stats
@@ -0,0 +1,44 @@
+"""Menu choices made by the Monte Carlo simulation, kept free of NumPy and OpenCV so they import instantly."""
+import random
+import itertools as it
+
+
+def menu_options(num_areas):
+    """Return (first, second) areas searched by each menu option, option 1 is at index 0.
+
+    Options 1 to num_areas search one area twice, the next options search two different areas once.
+    For three areas this gives the menu of draw_menu: 4 - Area 1 & 2, 5 - Area 1 & 3, 6 - Area 2 & 3.
+    """
+    areas = range(1, num_areas + 1)
+    return [(area, area) for area in areas] + list(it.combinations(areas, 2))
+
+
+def detection_probabilities(p):
+    """Return probability of detection of every menu option for target probabilities p, as printed by draw_menu."""
+    return [1 - (1 - p[first - 1]) ** 2 if first == second else p[first - 1] + p[second - 1]
+            for first, second in menu_options(len(p))]
+
+
+def pair_option(first, second, num_areas):
+    """Return menu option that searches areas first < second once each."""
+    i, j = first - 1, second - 1
+    return num_areas + 1 + i * (2 * num_areas - i - 1) // 2 + (j - i - 1)
+
+
+def monte_carlo_twice(*p, rng=random):
+    """Return the area with the highest probability of containing the sailor."""
+    best = max(p)
+    return int(rng.choice([area for area, prob in enumerate(p, start=1) if prob == best]))
+
+
+def monte_carlo_once(*p, rng=random):
+    """Return option searching the two areas with the highest probability of containing the sailor."""
+    best = max(p)
+    top = [area for area, prob in enumerate(p, start=1) if prob == best]
+    first = int(rng.choice(top))  # Ties are broken at random
+    if len(top) > 1:
+        second = int(rng.choice([area for area in top if area != first]))
+    else:
+        runner_up = max(prob for prob in p if prob != best)
+        second = int(rng.choice([area for area, prob in enumerate(p, start=1) if prob == runner_up]))
+    return pair_option(min(first, second), max(first, second), len(p))
@@ -0,0 +1,84 @@
+"""Daily drift of the sailor with the current and wind, for the simulated sailor and the target probabilities."""
+import math
+
+import numpy as np
+
+
+def _fast_size(n):
+    """Return smallest size >= n with no prime factors above 5, where FFTs are fastest."""
+    best = 2 ** math.ceil(math.log2(n))
+    fives = 1
+    while fives < best:
+        threes = fives
+        while threes < best:
+            size = threes * 2 ** max(math.ceil(math.log2(n / threes)), 0)
+            best = min(best, size)
+            threes *= 3
+        fives *= 5
+    return best
+
+
+class Drift:
+    """Motion of the sailor in one day: shift by velocity plus Gaussian diffusion, in map cells.
+
+    velocity is (dx, dy) in cells per day and diffusion the standard deviation of the daily
+    displacement around it. Probability grids are advanced by convolution with the kernel of the
+    displacement, done with FFTs so a day costs O(n log n) for a raster of n cells. The transformed
+    kernel is kept for every raster shape, so only the grid is transformed each day.
+    """
+
+    def __init__(self, velocity=(0.0, 0.0), diffusion=1.0):
+        self.velocity = (float(velocity[0]), float(velocity[1]))
+        self.diffusion = float(diffusion)
+        self.kernel = self._make_kernel()
+        self.radius = self.kernel.shape[0] // 2  # Kernel is centered on a displacement of zero
+        self._spectra = {}  # Raster shape -> (FFT shape, transformed kernel)
+
+    def _make_kernel(self):
+        """Return normalized weights of every whole-cell displacement, indexed [dy + radius, dx + radius]."""
+        vx, vy = self.velocity
+        if self.diffusion == 0:
+            radius = int(max(abs(round(vx)), abs(round(vy))))
+            kernel = np.zeros((2 * radius + 1, 2 * radius + 1))
+            kernel[radius + round(vy), radius + round(vx)] = 1.0
+            return kernel
+        radius = int(math.ceil(max(abs(vx), abs(vy)) + 4 * self.diffusion))
+        offsets = np.arange(-radius, radius + 1)
+        wx = np.exp(-(offsets - vx) ** 2 / (2 * self.diffusion ** 2))
+        wy = np.exp(-(offsets - vy) ** 2 / (2 * self.diffusion ** 2))
+        kernel = np.outer(wy, wx)
+        return kernel / kernel.sum()
+
+    def _spectrum(self, shape):
+        spectrum = self._spectra.get(shape)
+        if spectrum is None:
+            size = (_fast_size(shape[0] + 2 * self.radius), _fast_size(shape[1] + 2 * self.radius))
+            spectrum = size, np.fft.rfft2(self.kernel, size)
+            self._spectra[shape] = spectrum
+        return spectrum
+
+    def advance(self, grid, mask=None):
+        """Return grid of probabilities one day later, only on mask cells if given, normalized to the same total.
+
+        Probability drifting off the raster or onto land is dropped, and what stays is scaled
+        back up, as the sailor is known to be still on the map and on water.
+        """
+        total = grid.sum()
+        size, spectrum = self._spectrum(grid.shape)
+        moved = np.fft.irfft2(np.fft.rfft2(grid, size) * spectrum, size)
+        moved = moved[self.radius:self.radius + grid.shape[0], self.radius:self.radius + grid.shape[1]]
+        np.maximum(moved, 0, out=moved)  # Rounding errors of the FFT
+        if mask is not None:
+            moved[~mask] = 0
+        kept = moved.sum()
+        if kept > 0:
+            moved *= total / kept
+        return moved
+
+    def move(self, x, y, rng, shape, mask=None):
+        """Return map x, y of a sailor at x, y one day later, who stays put rather than leave the map or go on land."""
+        dx, dy = rng.normal(self.velocity, self.diffusion) if self.diffusion else self.velocity
+        new_x, new_y = int(round(x + dx)), int(round(y + dy))
+        if not (0 <= new_x < shape[1] and 0 <= new_y < shape[0]) or (mask is not None and not mask[new_y, new_x]):
+            return x, y
+        return new_x, new_y
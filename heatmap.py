@@ -0,0 +1,110 @@
+"""Heatmaps of batch simulation results and posterior grids drawn over the search map.
+
+Results of any number of trials are first accumulated into one count per map cell with
+np.bincount, so drawing a report costs the same for a thousand trials as for millions.
+"""
+import numpy as np
+
+import map_cache
+import mcs_batch
+import render
+from bayes_rule_MCS import MAP_FILE, SEARCH_AREAS
+
+MAP_SHAPE = (380, 500)  # Rows, columns of cape.png, used when the map can not be loaded
+
+
+def cell_coordinates(areas, area, loc, water=None):
+    """Return map x, y of cells loc (in the order cells are searched) of 0-based search areas.
+
+    water holds the ids of the water cells of every area (map_cache.water_cells) when the
+    simulation searched only water cells.
+    """
+    corners = np.asarray(areas)[area]
+    height = corners[:, 3] - corners[:, 1]
+    if water is not None:
+        offsets = np.cumsum([0] + [len(cells) for cells in water[:-1]])
+        loc = np.concatenate(water)[offsets[area] + loc]
+    x, y = np.divmod(loc, height)  # Same numbering as area_coverage.AreaCoverage
+    return x + corners[:, 0], y + corners[:, 1]
+
+
+def accumulate(shape, areas, area, loc, weights=None, counts=None, water=None):
+    """Add trials with sailors in cells loc of areas to a (rows, columns) grid of counts and return it.
+
+    With weights, every trial adds its weight instead of 1. Pass the returned counts back to add
+    more chunks of trials. water is the same as for cell_coordinates.
+    """
+    x, y = cell_coordinates(areas, area, loc, water)
+    flat = np.bincount(y * shape[1] + x, weights, minlength=shape[0] * shape[1]).reshape(shape[:2])
+    return flat if counts is None else counts + flat
+
+
+def accumulate_trajectories(reader, shape, areas, chunk_rows=1 << 20, water=None):
+    """Return grids of found sailors and of their total search days from a trajectories.TrajectoryReader.
+
+    Pass water (map_cache.water_cells) if the trajectories were simulated with water cells only.
+    """
+    counts = np.zeros(shape[:2])
+    days = np.zeros(shape[:2])
+    for chunk in reader.filter(lambda c: c['found'], ['sailor_area', 'sailor_loc', 'step'], chunk_rows):
+        counts = accumulate(shape, areas, chunk['sailor_area'], chunk['sailor_loc'], counts=counts, water=water)
+        days = accumulate(shape, areas, chunk['sailor_area'], chunk['sailor_loc'], chunk['step'], days, water)
+    return counts, days
+
+
+def colorize(values):
+    """Return BGR image coloring values from blue (lowest) to red (highest), cells that are 0 stay black."""
+    values = np.asarray(values, dtype=float)
+    high = values.max()
+    t = values / high if high > 0 else values
+    img = np.zeros(values.shape + (3,), dtype=np.uint8)
+    img[..., 0] = np.rint(255 * np.clip(1.5 - 2 * t, 0, 1) * (values > 0))  # Blue
+    img[..., 1] = np.rint(255 * np.clip(1.5 - abs(4 * t - 2), 0, 1))  # Green
+    img[..., 2] = np.rint(255 * np.clip(2 * t - 0.5, 0, 1))  # Red
+    return img
+
+
+def overlay(base, values, alpha=0.6):
+    """Return base image with the heatmap of values blended into every cell where values is not 0."""
+    img = np.array(base, dtype=np.uint8) if base is not None else np.full(values.shape + (3,), 255, np.uint8)
+    mask = values != 0
+    img[mask] = np.rint((1 - alpha) * img[mask] + alpha * colorize(values)[mask]).astype(np.uint8)
+    return img
+
+
+def render_report(counts, days, posterior=None, prefix='heatmap', backend='opencv', last_known=(160, 290)):
+    """Write heatmaps of found sailors, mean search days and posterior grid over the map, return file names."""
+    base = map_cache.base_layer(MAP_FILE, SEARCH_AREAS, last_known)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_days = np.where(counts > 0, days / counts, 0)
+    images = {'found': counts, 'days': mean_days}
+    if posterior is not None:
+        images['posterior'] = posterior
+    draw = render.get_backend(backend)
+    files = []
+    for name, values in images.items():
+        file = f'{prefix}_{name}.png'
+        draw.write(file, overlay(base, values))
+        files.append(file)
+    return files
+
+
+def main(num_trials=1_000_000, policy='once', seed=None, chunk_size=100_000):
+    rng = np.random.default_rng(seed)
+    base = map_cache.load_map(MAP_FILE)
+    shape = base.shape[:2] if base is not None else MAP_SHAPE
+    water = map_cache.water_cells(map_cache.water_mask(MAP_FILE), SEARCH_AREAS)  # Sailors only on water
+    cells = None if water is None else [len(c) for c in water]
+    counts = np.zeros(shape)
+    days = np.zeros(shape)
+    for start in range(0, num_trials, chunk_size):
+        scenarios = mcs_batch.RandomScenarios(min(chunk_size, num_trials - start), rng, cells=cells)
+        search_num = mcs_batch.simulate(scenarios, policy, rng)
+        counts = accumulate(shape, SEARCH_AREAS, scenarios.area, scenarios.loc, counts=counts, water=water)
+        days = accumulate(shape, SEARCH_AREAS, scenarios.area, scenarios.loc, search_num, days, water)
+    for file in render_report(counts, days):
+        print(f'Wrote {file}')
+
+
+if __name__ == '__main__':
+    main()
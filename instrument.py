@@ -0,0 +1,106 @@
+"""Opt-in timers and counters for simulation runs, and a progress reporter.
+
+Functions are instrumented by replacing them with timing wrappers only while a Profiler is
+active, so code that is not profiled runs the original functions at no cost.
+"""
+import json
+import sys
+import time
+
+
+class Profiler:
+    """Count every call of instrumented functions and time every sample_every-th call."""
+
+    def __init__(self, sample_every=10):
+        self.sample_every = sample_every
+        self.phases = {}  # Name -> [calls, timed calls, seconds of timed calls]
+        self.counters = {}
+        self._patched = []  # (owner, attribute, original) to restore
+        self._start = None
+        self._stop = None
+
+    def instrument(self, owner, *names):
+        """Wrap functions or methods names of a module or class owner with timers."""
+        for name in names:
+            original = getattr(owner, name)
+            label = f'{getattr(owner, "__name__", owner)}.{name}'
+            setattr(owner, name, self._wrap(label, original))
+            self._patched.append((owner, name, original))
+        return self
+
+    def _wrap(self, label, fn):
+        phase = self.phases.setdefault(label, [0, 0, 0.0])
+        every = self.sample_every
+
+        def timed(*args, **kwargs):
+            phase[0] += 1
+            if phase[0] % every:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                phase[1] += 1
+                phase[2] += time.perf_counter() - start
+
+        timed.__wrapped__ = fn
+        return timed
+
+    def count(self, name, n=1):
+        """Add n to counter name."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop = time.perf_counter()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+
+    def summary(self):
+        """Return dict with wall time, counters and per-phase calls and estimated times."""
+        stop = self._stop if self._stop is not None else time.perf_counter()
+        phases = {}
+        for label, (calls, timed, seconds) in self.phases.items():
+            mean = seconds / timed if timed else 0.0
+            phases[label] = {
+                'calls': calls,
+                'timed_calls': timed,
+                'mean_seconds': mean,
+                'estimated_total_seconds': mean * calls,
+            }
+        return {
+            'wall_seconds': stop - self._start if self._start is not None else 0.0,
+            'sample_every': self.sample_every,
+            'counters': dict(self.counters),
+            'phases': phases,
+        }
+
+    def export(self, path):
+        """Write summary to a JSON file."""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class ProgressReporter:
+    """Print progress at most once every interval seconds instead of once per trial."""
+
+    def __init__(self, total, interval=5.0, stream=sys.stderr):
+        self.total = total
+        self.interval = interval
+        self.stream = stream
+        self.start = time.perf_counter()
+        self._next = self.start + interval
+
+    def update(self, done):
+        """Report done trials if interval seconds passed since the last report or the run is complete."""
+        now = time.perf_counter()
+        if now < self._next and done < self.total:
+            return
+        self._next = now + self.interval
+        rate = done / (now - self.start) if now > self.start else 0.0
+        eta = (self.total - done) / rate if rate else float('inf')
+        print(f'I: {done}/{self.total} ({rate:,.0f} trials/s, {eta:,.0f} s left)', file=self.stream)
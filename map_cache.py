@@ -0,0 +1,134 @@
+"""Decode map files once and share the image read-only between all Search instances."""
+import os
+
+import numpy as np
+
+import render
+
+WATER_LEVEL = 200  # Pixels with all channels above this are water, grey land and black coast are not
+
+_maps = {}  # (absolute path, mtime) -> decoded read-only image
+_water = {}  # (absolute path, mtime) -> read-only boolean water mask
+_layers = {}  # (absolute path, mtime, corners, last known position) -> annotated read-only image
+
+
+def load_map(map_file):
+    """Return decoded map image or None if it can not be loaded, reloaded only when the file changes."""
+    path = os.path.abspath(map_file)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    img = _maps.get((path, mtime))
+    if img is None:
+        img = render.get_backend('opencv').load(path)
+        if img is None:
+            return None
+        img.flags.writeable = False
+        for key in [key for key in _maps if key[0] == path]:  # Drop outdated versions of the map
+            del _maps[key]
+        _maps[(path, mtime)] = img
+    return img
+
+
+def base_layer(map_file, corners, last_known):
+    """Return read-only map with scale, search areas and last known position, drawn once per map and layout.
+
+    Returns None if the map can not be loaded. Frames are made by copying the layer and drawing
+    only what changes on the copy.
+    """
+    img = load_map(map_file)
+    if img is None:
+        return None
+    path = os.path.abspath(map_file)
+    key = (path, os.path.getmtime(path), tuple(map(tuple, corners)), tuple(last_known))
+    layer = _layers.get(key)
+    if layer is None:
+        layer = img.copy()
+        draw = render.get_backend('opencv')
+        draw.line(layer, (20, 370), (70, 370), (0, 0, 0), 2)  # draw scale line
+        draw.text(layer, '0', (8, 370), (0, 0, 0))
+        draw.text(layer, '50 Nautical Miles', (71, 370), (0, 0, 0))
+
+        # Draw search areas
+        for area_num, c in enumerate(corners, start=1):
+            draw.rectangle(layer, (c[0], c[1]), (c[2], c[3]), (0, 0, 0), 1)
+            draw.text(layer, str(area_num), (c[0] + 3, c[1] + 15), 0)
+
+        draw.text(layer, '+', tuple(last_known), (0, 0, 255))
+        draw.text(layer, '+ = Last Known Position', (274, 355), (0, 0, 255))
+        draw.text(layer, '* = Actual Position', (275, 370), (255, 0, 0))
+        layer.flags.writeable = False
+        for old in [old for old in _layers if old[0] == path and old[1] != key[1]]:  # Drop layers of outdated maps
+            del _layers[old]
+        _layers[key] = layer
+    return layer
+
+
+def water_mask(map_file):
+    """Return read-only boolean mask of water cells of the map or None if it can not be loaded.
+
+    The mask is computed once and cached next to the map as <map>.water.npz, so later runs only
+    read a bit-packed array. The cache is rebuilt when the map file changes.
+    """
+    path = os.path.abspath(map_file)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    mask = _water.get((path, mtime))
+    if mask is not None:
+        return mask
+
+    cache = os.path.splitext(path)[0] + '.water.npz'
+    try:
+        with np.load(cache) as data:
+            if float(data['mtime']) == mtime:
+                shape = tuple(data['shape'])
+                mask = np.unpackbits(data['bits'], count=shape[0] * shape[1]).reshape(shape).astype(bool)
+    except (OSError, KeyError, ValueError):
+        pass
+    if mask is None:
+        img = load_map(map_file)
+        if img is None:
+            return None
+        mask = (img > WATER_LEVEL).all(axis=2)
+        try:
+            tmp = f'{cache}.tmp'
+            with open(tmp, 'wb') as f:
+                np.savez(f, bits=np.packbits(mask), shape=np.array(mask.shape), mtime=np.array(mtime))
+            os.replace(tmp, cache)
+        except OSError:  # Read-only map directory, classify again next run
+            pass
+    mask.flags.writeable = False
+    for key in [key for key in _water if key[0] == path]:
+        del _water[key]
+    _water[(path, mtime)] = mask
+    return mask
+
+
+def water_cells(mask, corners):
+    """Return sorted ids of water cells of every search area, numbered like area_coverage.AreaCoverage (x * height + y).
+
+    Returns None when there is no mask, every cell is then searched.
+    """
+    if mask is None:
+        return None
+    return tuple(np.flatnonzero(mask[c[1]:c[3], c[0]:c[2]].T) for c in corners)
+
+
+def search_areas(img, corners):
+    """Return read-only views of the map for every (UL-X, UL-Y, LR-X, LR-Y) search area."""
+    return tuple(img[c[1]:c[3], c[0]:c[2]] for c in corners)
+
+
+def blank_areas(corners):
+    """Return read-only all-white search areas for headless runs that do not load the map."""
+    return tuple(np.broadcast_to(np.uint8(255), (c[3] - c[1], c[2] - c[0], 3)) for c in corners)
+
+
+def clear():
+    """Forget all decoded maps and drawn layers."""
+    _maps.clear()
+    _layers.clear()
+    _water.clear()
@@ -0,0 +1,246 @@
+"""Vectorized batch version of the Monte Carlo simulation from bayes_rule_MCS.
+The state of many trials is kept in NumPy arrays and every trial that is still running
+is advanced by one search day per step, so millions of trials take seconds instead of hours."""
+import numpy as np
+
+import map_cache
+from bayes_rule_MCS import MAP_FILE, SEARCH_AREAS, PRIORS, EFFECTIVENESS
+from decisions import menu_options
+from posterior import normalize_log
+
+
+def menu_areas(num_areas):
+    """Return (options + 1, 2) array of 0-based areas searched by each menu option, row 0 (Quit) is unused."""
+    return np.array([(0, 0)] + menu_options(num_areas)) - 1
+
+
+def area_cells(areas):
+    """Return number of cells in every (UL-X, UL-Y, LR-X, LR-Y) search area."""
+    return np.array([(c[2] - c[0]) * (c[3] - c[1]) for c in areas])
+
+
+def water_cells(areas=SEARCH_AREAS, map_file=MAP_FILE):
+    """Return number of water cells in every search area of the map, all cells if the map can not be loaded.
+
+    This is what run_batch and the scenarios search when they are not given cells.
+    """
+    mask = map_cache.water_mask(map_file)
+    if mask is None:
+        return area_cells(areas)
+    return np.array([len(cells) for cells in map_cache.water_cells(mask, areas)])
+
+
+def scenario_cells(areas=SEARCH_AREAS, cells=None):
+    """Return searchable cells of every area: cells if given, otherwise the water cells of the map.
+
+    Pass cells=area_cells(areas) to search every cell, e.g. for areas that are not on the map.
+    """
+    if cells is not None:
+        return np.asarray(cells)
+    cells = water_cells(areas)
+    if (cells == 0).any():
+        raise ValueError(f'Search areas {np.flatnonzero(cells == 0) + 1} have no water cells, '
+                         f'pass cells=area_cells(areas) to search every cell')
+    return cells
+
+
+def top_areas(p, rng, k):
+    """Return (N, k) array of 0-based areas with the k highest probabilities in every row of p, highest first.
+
+    Ties are broken at random like random.choice in decisions.py: every area gets one random key,
+    and the area with the highest key wins among areas with the same probability. Only the order
+    of p matters, so unnormalized probabilities or log-probabilities give the same areas.
+    """
+    rows = np.arange(len(p))
+    keys = rng.random(p.shape)
+    remaining = np.array(p, dtype=float)
+    taken = np.zeros(p.shape, dtype=bool)
+    top = np.empty((len(p), k), dtype=np.int64)
+    for i in range(k):
+        best = (remaining == remaining.max(axis=1, keepdims=True)) & ~taken
+        top[:, i] = np.where(best, keys, -1.0).argmax(axis=1)
+        remaining[rows, top[:, i]] = -np.inf
+        taken[rows, top[:, i]] = True
+    return top
+
+
+def batch_pair_option(first, second, num_areas):
+    """Return menu options that search 0-based areas first and second once each, like decisions.pair_option."""
+    i, j = np.minimum(first, second), np.maximum(first, second)
+    return num_areas + 1 + i * (2 * num_areas - i - 1) // 2 + (j - i - 1)
+
+
+def batch_monte_carlo_twice(p, rng):
+    """Return menu option searching the area with the highest probability twice for every row of p."""
+    return top_areas(p, rng, 1)[:, 0] + 1
+
+
+def batch_monte_carlo_once(p, rng):
+    """Return menu option searching the two areas with the highest probability for every row of p."""
+    top = top_areas(p, rng, 2)
+    return batch_pair_option(top[:, 0], top[:, 1], p.shape[1])
+
+
+# Policies that only compare target probabilities are given log-probabilities, which saves normalizing them
+batch_monte_carlo_twice.uses_log_probs = True
+batch_monte_carlo_once.uses_log_probs = True
+
+POLICIES = {
+    'once': batch_monte_carlo_once,
+    'twice': batch_monte_carlo_twice,
+}
+
+
+def _search(state, rows, area, k):
+    """Search k cells of area for every trial in rows, return True where the sailor was found.
+
+    Like area_coverage.AreaCoverage, cells are searched in a fixed order after a cursor, so the number
+    of searched cells per area is all that is needed to know if the next search finds the sailor.
+    """
+    before = state['searched'][rows, area]
+    after = np.minimum(before + k, state['cells'][area])
+    state['searched'][rows, area] = after
+    loc = state['loc'][rows]
+    return (before <= loc) & (loc < after) & (state['area'][rows] == area), after - before
+
+
+def place_sailors(n, rng, cells, mode=None):
+    """Return 0-based search area and cell of the sailor in n trials, areas as in Search.sailor_final_location."""
+    num_areas = len(cells)
+    mode = (num_areas + 2) / 2 if mode is None else mode
+    area = np.minimum(rng.triangular(1, mode, num_areas + 1, n).astype(np.int64), num_areas) - 1
+    return area, rng.integers(0, cells[area])  # Sailor cell in the order cells are searched
+
+
+class RandomScenarios:
+    """Sailors and daily search effectiveness of n trials, drawn from one generator as the simulation runs."""
+
+    def __init__(self, n, rng, areas=SEARCH_AREAS, effectiveness=EFFECTIVENESS, sailor_mode=None, cells=None):
+        self.n = n
+        self.cells = scenario_cells(areas, cells)  # Searchable cells per area, water by default
+        self.rng = rng
+        self.effectiveness_range = effectiveness
+        self.area, self.loc = place_sailors(n, rng, self.cells, sailor_mode)
+
+    def effectiveness(self, day, trials):
+        """Return search effectiveness of every area on day (from 1) for the given trials."""
+        return self.rng.uniform(*self.effectiveness_range, (len(trials), len(self.cells)))  # calc_search_effectiveness
+
+
+class PairedScenarios(RandomScenarios):
+    """Scenarios where the effectiveness of a trial on a given day does not depend on earlier draws.
+
+    Every day has its own random stream derived from seed_seq, so policies that search a different
+    number of days still meet exactly the same sailors and search conditions.
+    """
+
+    def __init__(self, n, seed_seq, areas=SEARCH_AREAS, effectiveness=EFFECTIVENESS, sailor_mode=None, cells=None):
+        self.seed_seq = seed_seq
+        super().__init__(n, np.random.default_rng(self._stream(0)), areas, effectiveness, sailor_mode, cells)
+
+    def _stream(self, key):
+        """Return child SeedSequence number key, spawned without changing seed_seq."""
+        return np.random.SeedSequence(self.seed_seq.entropy, spawn_key=self.seed_seq.spawn_key + (key,))
+
+    def effectiveness(self, day, trials):
+        day_rng = np.random.default_rng(self._stream(day))
+        return day_rng.uniform(*self.effectiveness_range, (self.n, len(self.cells)))[trials]
+
+
+def run_batch(num_trials, policy='once', rng=None, chunk_size=100_000, areas=SEARCH_AREAS, priors=PRIORS,
+              recorder=None, effectiveness=EFFECTIVENESS, sailor_mode=None, cells=None):
+    """Return array with the number of search days needed to find the sailor in every trial.
+
+    Sailors are placed and searched for on the water cells of the areas unless cells is given.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    cells = scenario_cells(areas, cells)
+    results = np.empty(num_trials, dtype=np.int64)
+    for start in range(0, num_trials, chunk_size):
+        stop = min(start + chunk_size, num_trials)
+        scenarios = RandomScenarios(stop - start, rng, areas, effectiveness, sailor_mode, cells)
+        results[start:stop] = simulate(scenarios, policy, rng, priors, recorder)
+    return results
+
+
+def simulate(scenarios, policy='once', rng=None, priors=PRIORS, recorder=None):
+    """Simulate all trials of scenarios together until every sailor is found, return search days per trial.
+
+    rng is only used by the policy to break ties. Policies with a true uses_coverage attribute
+    (such as planner.Planner) are also given the searched fraction of every area. Every search day
+    is written to recorder (a trajectories.TrajectoryRecorder) if one is given.
+
+    Target probabilities are kept as log-likelihoods, Bayes' rule adds log(1 - effectiveness), and
+    they are normalized only for policies and the recorder that read probabilities. Policies with a
+    true uses_log_probs attribute get the log-likelihoods themselves.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    choose = POLICIES[policy] if isinstance(policy, str) else policy
+    n = scenarios.n
+    cells = scenarios.cells
+    num_areas = len(cells)
+    options = menu_areas(num_areas)
+    with np.errstate(divide='ignore'):
+        log_priors = np.log(np.array(priors, dtype=float))
+    uses_log_probs = getattr(choose, 'uses_log_probs', False)
+    state = {
+        'area': scenarios.area,
+        'loc': scenarios.loc,
+        'cells': cells,
+        'log_p': np.tile(log_priors, (n, 1)),  # Unnormalized log target probabilities
+        'searched': np.zeros((n, num_areas), dtype=np.int64),  # Searched cells per area
+    }
+    search_num = np.ones(n, dtype=np.int64)
+    active = np.arange(n)
+    first_trial = recorder.start_trials(n) if recorder is not None else 0
+
+    while active.size:
+        m = active.size
+        rows = np.arange(m)
+        sep = scenarios.effectiveness(search_num[active[0]], active)
+        log_p = state['log_p'][active]
+        p_active = normalize_log(log_p) if recorder is not None or not uses_log_probs else None
+        p_policy = log_p if uses_log_probs else p_active
+        if getattr(choose, 'uses_coverage', False):
+            choice = choose(p_policy, rng, coverage=state['searched'][active] / cells)
+        else:
+            choice = choose(p_policy, rng)
+        first, second = options[choice, 0], options[choice, 1]
+        twice = first == second
+
+        found_1, size_1 = _search(state, active, first, (cells[first] * sep[rows, first]).astype(np.int64))
+        found_2, size_2 = _search(state, active, second, (cells[second] * sep[rows, second]).astype(np.int64))
+
+        # Effectiveness used for Bayes' rule, areas not searched today keep 0 as in bayes_rule_MCS.main
+        used = np.zeros((m, num_areas))
+        used[rows, first] = np.where(twice, (size_1 + size_2) / cells[first], sep[rows, first])
+        used[rows, second] = np.where(twice, used[rows, first], sep[rows, second])
+        exhausted = state['searched'][active] == cells
+        searched_today = np.zeros((m, num_areas), dtype=bool)
+        searched_today[rows, first] = True
+        searched_today[rows, second] = True
+        used[exhausted & searched_today] = 1.0  # All coordinates have been searched
+
+        found = found_1 | found_2
+        searching = ~found
+        if recorder is not None:
+            recorder.record(trial=first_trial + active, step=search_num[active], action=choice, effectiveness=sep,
+                            posterior=p_active, found=found, sailor_area=state['area'][active],
+                            sailor_loc=state['loc'][active])
+        with np.errstate(divide='ignore'):  # Exhausted areas get log(0) = -inf
+            state['log_p'][active[searching]] = log_p[searching] + np.log1p(-used[searching])
+        search_num[active[searching]] += 1
+        active = active[searching]
+    return search_num
+
+
+def main(num_trials=10000, policy='once'):
+    results = run_batch(num_trials, policy)
+    average = results.mean()  # Calculate average number of searches
+    print(f'Average: {average}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Run the batch Monte Carlo simulation on all cores of the machine.
+Trials are split into fixed size blocks and every block gets its own random stream spawned
+from one SeedSequence, so the same seed gives identical results with any number of workers."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import mcs_batch
+from stats import RunningStats
+
+BLOCK_SIZE = 50_000  # Trials simulated per task
+
+
+def run_block(seed_seq, num_trials, policy, areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS, cells=None):
+    """Return statistics of the number of searches needed to find the sailor in one block of trials."""
+    search_stats = RunningStats()
+    rng = np.random.default_rng(seed_seq)
+    search_stats.add_batch(mcs_batch.run_batch(num_trials, policy, rng, areas=areas, priors=priors, cells=cells))
+    return search_stats
+
+
+def run_parallel(num_trials, policy='once', seed=None, workers=None, block_size=BLOCK_SIZE, cells=None):
+    """Return RunningStats of the number of searches needed to find the sailor.
+
+    policy must be a policy name from mcs_batch.POLICIES or a module level function so it can be
+    sent to the worker processes. cells are the searchable cells per area, water cells by default.
+    """
+    cells = mcs_batch.scenario_cells(mcs_batch.SEARCH_AREAS, cells)
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    sizes = [min(block_size, num_trials - start) for start in range(0, num_trials, block_size)]
+    # Children derived like spawn, but without advancing seed_seq, so it gives the same blocks every call
+    seeds = [np.random.SeedSequence(seed_seq.entropy, spawn_key=seed_seq.spawn_key + (i,)) for i in range(len(sizes))]
+    if workers == 1:
+        blocks = [run_block(s, size, policy, cells=cells) for s, size in zip(seeds, sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(run_block, seeds, sizes, [policy] * len(sizes), [mcs_batch.SEARCH_AREAS] * len(sizes),
+                                   [mcs_batch.PRIORS] * len(sizes), [cells] * len(sizes)))
+    search_stats = RunningStats()
+    for block in blocks:  # Merged in block order, so the result does not depend on the workers
+        search_stats.merge(block)
+    return search_stats
+
+
+def main(num_trials=1_000_000, policy='once', seed=None):
+    search_stats = run_parallel(num_trials, policy, seed)
+    print(f'Workers: {os.cpu_count()}, Trials: {search_stats.count}')
+    print(f'Average: {search_stats.mean}')
+
+
+if __name__ == '__main__':
+    main()
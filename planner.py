@@ -0,0 +1,120 @@
+"""Lookahead planner choosing the menu option with the lowest expected number of searches to find the sailor.
+Replaces the greedy choice of monte_carlo_once/twice with dynamic programming over a few days ahead."""
+from collections import OrderedDict
+
+import numpy as np
+
+from bayes_rule_MCS import EFFECTIVENESS, PRIORS
+from decisions import menu_options
+
+
+class Planner:
+    """Choose menu options by minimizing expected searches to find the sailor over horizon days.
+
+    Cells are searched in a fixed order after a cursor (see area_coverage.AreaCoverage), so the state
+    of a search is the fraction of every area searched so far, and the posterior probability that
+    the sailor is in area i is proportional to prior_i * (1 - fraction_i). A day searches the areas
+    of a menu option with effectiveness drawn uniformly from effectiveness (calc_search_effectiveness),
+    averaged over effectiveness_points quadrature points. Beyond the horizon the remaining searches
+    are estimated as geometric with the best detection probability of the last day.
+
+    States are fractions rounded to multiples of 1 / levels, and their values are kept in an LRU
+    table of at most cache_size entries, so states seen before in any trial cost one lookup.
+    Only options among the candidates most probable areas are considered, which keeps planning
+    fast for many areas.
+
+    The plan is only as good as this model: it takes priors as the true distribution of the sailor
+    over the areas, ignores the target probabilities p given by mcs_batch.simulate, and assumes the
+    sailor stays put (no drift). It gains most over monte_carlo_once and monte_carlo_twice when
+    searches are weak and the priors uneven, where it mixes both kinds of search (see test_planner.py).
+    """
+
+    # Batch policies are called with the searched fraction of every area (see mcs_batch.simulate)
+    uses_coverage = True
+
+    def __init__(self, priors=PRIORS, horizon=3, levels=20, cache_size=100_000, candidates=4,
+                 effectiveness_points=3, effectiveness=EFFECTIVENESS):
+        self.priors = np.asarray(priors, dtype=float)
+        self.num_areas = len(self.priors)
+        self.horizon = horizon
+        self.levels = levels
+        self.cache_size = cache_size
+        self.candidates = min(candidates, self.num_areas)
+        self.options = menu_options(self.num_areas)
+        low, high = effectiveness
+        self.effectiveness = low + (high - low) * (np.arange(effectiveness_points) + 0.5) / effectiveness_points
+        self._memo = OrderedDict()  # (state, horizon) -> (expected searches, option index)
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """Return fraction of state lookups answered from the memo table."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _quantize(self, coverage):
+        """Return searched fractions in steps of 1 / levels, rounded down so that no unsearched area looks finished."""
+        return np.floor(np.asarray(coverage) * self.levels + 1e-9).astype(int)
+
+    def _candidate_options(self, p):
+        """Return option indexes that search only the most probable areas."""
+        top = set(np.argsort(-p, kind='stable')[:self.candidates] + 1)
+        return [i for i, (first, second) in enumerate(self.options) if first in top and second in top]
+
+    def _value(self, state, horizon):
+        """Return (expected searches to find the sailor, best option index) for a quantized state."""
+        key = (state, horizon)
+        memo = self._memo
+        if key in memo:
+            self.hits += 1
+            memo.move_to_end(key)
+            return memo[key]
+        self.misses += 1
+
+        coverage = np.array(state) / self.levels
+        unfound = self.priors * (1 - coverage)  # Probability that the sailor is in area and not found
+        total = unfound.sum()
+        if total <= 0:
+            best = (1.0, 0)  # Everything has been searched
+        else:
+            best = (np.inf, 0)
+            for option in self._candidate_options(unfound):
+                first, second = self.options[option]
+                expected = 0.0
+                for sep in self.effectiveness:
+                    after = coverage.copy()
+                    after[first - 1] = min(1.0, after[first - 1] + sep)
+                    after[second - 1] = min(1.0, after[second - 1] + sep)  # Same area twice adds sep again
+                    miss = (self.priors * (1 - after)).sum() / total  # Probability of not finding the sailor today
+                    if miss <= 0:
+                        expected += 1
+                    elif miss >= 1:
+                        expected = np.inf  # Searches only areas where the sailor cannot be
+                        break
+                    elif horizon <= 1:
+                        expected += 1 + miss / (1 - miss)  # Geometric tail estimate
+                    else:
+                        expected += 1 + miss * self._value(tuple(self._quantize(after)), horizon - 1)[0]
+                expected /= len(self.effectiveness)
+                if expected < best[0]:
+                    best = (expected, option)
+
+        memo[key] = best
+        if len(memo) > self.cache_size:
+            memo.popitem(last=False)
+        return best
+
+    def expected_searches(self, coverage):
+        """Return expected number of searches to find the sailor from searched fraction of every area."""
+        return self._value(tuple(self._quantize(coverage)), self.horizon)[0]
+
+    def choose(self, coverage):
+        """Return menu option (from 1) for searched fraction of every area."""
+        return self._value(tuple(self._quantize(coverage)), self.horizon)[1] + 1
+
+    def __call__(self, p, rng=None, coverage=None):
+        """Batch policy for mcs_batch: return menu option for every row of an (N, areas) coverage array."""
+        unique, inverse = np.unique(self._quantize(coverage), axis=0, return_inverse=True)
+        choices = np.array([self._value(tuple(state), self.horizon)[1] + 1 for state in unique])
+        return choices[inverse.ravel()]
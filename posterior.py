@@ -0,0 +1,115 @@
+"""Probability of the sailor being in each cell of the map, updated with Bayes' rule after every search."""
+import numpy as np
+
+
+def normalize_log(log_p):
+    """Return probabilities of log-likelihoods log_p normalized over the last axis with log-sum-exp.
+
+    Rows where every likelihood is 0 (every area fully searched) get the same probability for all areas.
+    """
+    log_p = np.asarray(log_p, dtype=float)
+    top = log_p.max(axis=-1, keepdims=True)
+    finite = np.isfinite(top)
+    with np.errstate(invalid='ignore'):
+        p = np.exp(log_p - np.where(finite, top, 0))
+        p /= p.sum(axis=-1, keepdims=True)
+    return np.where(finite, p, 1 / log_p.shape[-1])
+
+
+class TargetProbs:
+    """Target probabilities of the search areas, kept as log-likelihoods and normalized only when read.
+
+    Bayes' rule adds log(1 - sep) instead of multiplying by 1 - sep and dividing by the sum after
+    every search, so long unsuccessful searches do not underflow to all zeros.
+    """
+
+    def __init__(self, priors):
+        with np.errstate(divide='ignore'):
+            self.log_p = np.log(np.asarray(priors, dtype=float))
+        self._probs = None
+
+    def revise(self, sep):
+        """Apply Bayes' rule for unsuccessful searches of every area with search effectiveness sep."""
+        with np.errstate(divide='ignore'):
+            self.log_p = self.log_p + np.log1p(-np.asarray(sep, dtype=float))
+        self._probs = None
+
+    def weight(self, factors):
+        """Multiply target probabilities by factors, e.g. the planned search effectiveness."""
+        with np.errstate(divide='ignore'):
+            self.log_p = self.log_p + np.log(np.asarray(factors, dtype=float))
+        self._probs = None
+
+    @property
+    def probs(self):
+        """Return read-only normalized target probabilities."""
+        if self._probs is None:
+            self._probs = normalize_log(self.log_p)
+            self._probs.flags.writeable = False
+        return self._probs
+
+
+class PosteriorGrid:
+    """Float grid over the map raster with the target probability of every cell.
+
+    Area probabilities are sums over rectangles, read from a summed-area table that is
+    rebuilt only once after the grid changes, so every area costs four lookups.
+    """
+
+    def __init__(self, shape, areas, priors, mask=None):
+        self.grid = np.zeros(shape[:2])
+        self.mask = mask  # Water cells of the map, None when every cell is water
+        self.areas = tuple(areas)  # (UL-X, UL-Y, LR-X, LR-Y) of every search area
+        for c, prior in zip(self.areas, priors):  # Spread area priors evenly over their cells
+            if mask is None:
+                self.grid[c[1]:c[3], c[0]:c[2]] += prior / ((c[2] - c[0]) * (c[3] - c[1]))
+            else:  # Only over water cells when a water mask of the map is given
+                water = mask[c[1]:c[3], c[0]:c[2]]
+                self.grid[c[1]:c[3], c[0]:c[2]] += np.where(water, prior / max(water.sum(), 1), 0)
+        self.grid /= self.grid.sum()
+        self._table = None
+
+    def update(self, xs, ys, detection_prob=1.0):
+        """Apply Bayes' rule for an unsuccessful search of map cells xs, ys."""
+        self.grid[ys, xs] *= 1 - detection_prob
+        total = self.grid.sum()
+        if total != 0:
+            self.grid /= total
+        self._table = None
+
+    def update_area(self, area_num, coords, detection_prob=1.0):
+        """Apply Bayes' rule for an unsuccessful search of local (x, y) coords of a search area."""
+        corners = self.areas[area_num - 1]
+        coords = np.asarray(coords).reshape(-1, 2)
+        self.update(coords[:, 0] + corners[0], coords[:, 1] + corners[1], detection_prob)
+
+    def advance(self, drift):
+        """Move the probabilities one day with drift.Drift, only onto water cells."""
+        self.grid = drift.advance(self.grid, self.mask)
+        self._table = None
+
+    def summed_area_table(self):
+        """Return table with the sum of all cells above and left of every grid corner."""
+        if self._table is None:
+            table = np.zeros((self.grid.shape[0] + 1, self.grid.shape[1] + 1))
+            np.cumsum(np.cumsum(self.grid, axis=0), axis=1, out=table[1:, 1:])
+            self._table = table
+        return self._table
+
+    def rect_prob(self, corners):
+        """Return probability of the sailor being inside (UL-X, UL-Y, LR-X, LR-Y) rectangle."""
+        table = self.summed_area_table()
+        x0, y0, x1, y1 = corners
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+    def area_probs(self):
+        """Return target probabilities of all search areas."""
+        return np.array([self.rect_prob(c) for c in self.areas])
+
+    def best_cells(self, count):
+        """Return x, y map coordinates of the count most probable cells, most probable first."""
+        flat = self.grid.ravel()
+        top = np.argpartition(flat, -count)[-count:]
+        top = top[np.argsort(flat[top])[::-1]]
+        ys, xs = np.unravel_index(top, self.grid.shape)
+        return np.column_stack((xs, ys))
@@ -0,0 +1,93 @@
+"""Rendering backends for the search map.
+OpenCV is imported only when a backend that draws is first used, so simulations that never
+draw anything do not pay for importing cv2 and do not need a display."""
+import os
+
+_backends = {}  # Name -> created backend
+
+
+class OpenCVBackend:
+    """Draw on the map image and show it in an OpenCV window."""
+
+    def __init__(self):
+        import cv2
+        self.cv = cv2
+
+    def load(self, map_file):
+        """Return decoded color image or None if it can not be loaded."""
+        return self.cv.imread(map_file, self.cv.IMREAD_COLOR)
+
+    def line(self, img, pt1, pt2, color, thickness=1):
+        self.cv.line(img, pt1, pt2, color, thickness)
+
+    def rectangle(self, img, pt1, pt2, color, thickness=1):
+        self.cv.rectangle(img, pt1, pt2, color, thickness)
+
+    def circle(self, img, center, radius, color, thickness=1):
+        self.cv.circle(img, center, radius, color, thickness)
+
+    def text(self, img, text, org, color):
+        self.cv.putText(img, text, org, self.cv.FONT_HERSHEY_PLAIN, 1, color)
+
+    def show(self, window, img, wait_ms, position=None):
+        """Show image in a window and wait wait_ms milliseconds for it to be drawn."""
+        self.cv.imshow(window, img)
+        if position is not None:
+            self.cv.moveWindow(window, *position)
+        self.cv.waitKey(wait_ms)
+
+    def write(self, path, img):
+        """Write image to a file, the format is chosen by the file extension."""
+        if not self.cv.imwrite(path, img):
+            raise OSError(f'Could not write image {path}')
+
+
+class OffscreenBackend(OpenCVBackend):
+    """Draw like OpenCVBackend, but write every shown image to a numbered file instead of a window."""
+
+    def __init__(self, output_dir='frames'):
+        super().__init__()
+        self.output_dir = output_dir
+        self.frames = 0
+
+    def show(self, window, img, wait_ms, position=None):
+        """Write image to output_dir/<window>_<frame>.png without waiting."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.write(os.path.join(self.output_dir, f"{window.replace(' ', '_')}_{self.frames:05d}.png"), img)
+        self.frames += 1
+
+
+class HeadlessBackend:
+    """Backend for batch runs, drawing does nothing."""
+
+    def line(self, img, pt1, pt2, color, thickness=1):
+        pass
+
+    def rectangle(self, img, pt1, pt2, color, thickness=1):
+        pass
+
+    def circle(self, img, center, radius, color, thickness=1):
+        pass
+
+    def text(self, img, text, org, color):
+        pass
+
+    def show(self, window, img, wait_ms, position=None):
+        pass
+
+    def write(self, path, img):
+        pass
+
+
+BACKENDS = {
+    'opencv': OpenCVBackend,
+    'headless': HeadlessBackend,
+    'offscreen': OffscreenBackend,
+}
+
+
+def get_backend(name='opencv'):
+    """Return backend by name, created on first use."""
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
@@ -0,0 +1,289 @@
+"""Local HTTP/JSON service holding the target probabilities of many search incidents in one warm process.
+
+    POST   /incidents              {"priors": [...], "psep": [...]}  create incident, both optional
+    GET    /incidents/<id>         target probabilities and probability of detection table
+    POST   /incidents/<id>/search  {"sep": [...], "found": false, "psep": [...]}  report a search
+    DELETE /incidents/<id>         forget incident
+
+Reported searches are queued and applied by one worker thread, which takes every search that
+arrived within max_wait seconds and revises the target probabilities of all of them with one
+vectorized Bayes update per number of search areas.
+"""
+import itertools as it
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from bayes_rule import PRIORS
+from mcs_batch import menu_areas
+from posterior import normalize_log
+
+
+def detection_table(p):
+    """Return probability of detection of every menu option for every row of p, like decisions.detection_probabilities."""
+    options = menu_areas(p.shape[1])[1:]
+    first, second = p[:, options[:, 0]], p[:, options[:, 1]]
+    return np.where(options[:, 0] == options[:, 1], 1 - (1 - first) ** 2, first + second)
+
+
+def _probabilities(values, name, length=None):
+    """Return values as float array, raise ValueError unless they are a list of length numbers between 0 and 1."""
+    if not isinstance(values, (list, tuple)) or not values or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        raise ValueError(f'{name} must be a non-empty list of numbers')
+    array = np.array(values, dtype=float)
+    if not ((array >= 0) & (array <= 1)).all():  # NaN fails too
+        raise ValueError(f'{name} values must be between 0 and 1')
+    if length is not None and len(array) != length:
+        raise ValueError(f'{name} has {len(array)} values for {length} search areas')
+    return array
+
+
+def _found(value):
+    """Return value, raise ValueError unless it is a JSON boolean."""
+    if not isinstance(value, bool):
+        raise ValueError('found must be true or false')
+    return value
+
+
+class IncidentStore:
+    """Target probabilities of all incidents, changed only while holding the lock."""
+
+    def __init__(self):
+        self.incidents = {}  # Id -> dict with log target probabilities log_p, searches and status
+        self.lock = threading.Lock()
+        self._ids = it.count(1)
+
+    def create(self, priors=PRIORS, psep=None):
+        """Add incident, psep is the planned search effectiveness taken into account like in bayes_rule.play."""
+        priors = _probabilities(priors, 'priors')
+        with np.errstate(divide='ignore'):
+            log_p = np.log(priors)
+            if psep is not None:
+                log_p += np.log(_probabilities(psep, 'psep', len(priors)))
+        incident = {'log_p': log_p, 'searches': 0, 'status': 'searching'}
+        with self.lock:
+            incident_id = str(next(self._ids))
+            view = self._describe(incident_id, incident)  # Stored only if it can be shown
+            self.incidents[incident_id] = incident
+            return incident_id, view
+
+    def get(self, incident_id):
+        with self.lock:
+            return self._view(incident_id)
+
+    def delete(self, incident_id):
+        with self.lock:
+            del self.incidents[incident_id]
+
+    def _view(self, incident_id):
+        return self._describe(incident_id, self.incidents[incident_id])
+
+    @staticmethod
+    def _describe(incident_id, incident):
+        p = normalize_log(incident['log_p'])  # Normalized only when read, like posterior.TargetProbs
+        return {
+            'id': incident_id,
+            'status': incident['status'],
+            'searches': incident['searches'],
+            'p': p.tolist(),
+            'detection': detection_table(p[None, :])[0].tolist(),
+        }
+
+    def revise(self, searches):
+        """Apply searches [(id, sep, found, psep)] with one Bayes update per number of areas, return views or errors.
+
+        Every search is checked before anything changes, so an invalid search fails only itself.
+        Searches of the same incident are applied in order, in rounds that hold at most one search
+        of every incident.
+        """
+        results = [None] * len(searches)
+        searches = list(searches)
+        with self.lock:
+            rounds = []  # rounds[k] holds indexes of searches that are the k-th of their incident
+            seen = {}
+            for i, (incident_id, sep, found, psep) in enumerate(searches):
+                incident = self.incidents.get(incident_id)
+                if incident is None:
+                    results[i] = KeyError(incident_id)
+                    continue
+                try:
+                    num_areas = len(incident['log_p'])
+                    sep = _probabilities(sep, 'sep', num_areas)
+                    psep = None if psep is None else _probabilities(psep, 'psep', num_areas)
+                    found = _found(found)
+                except ValueError as e:
+                    results[i] = e
+                else:
+                    searches[i] = (incident_id, sep, found, psep)
+                    k = seen.get(incident_id, 0)
+                    seen[incident_id] = k + 1
+                    if k == len(rounds):
+                        rounds.append([])
+                    rounds[k].append(i)
+
+            for indexes in rounds:
+                groups = {}
+                for i in indexes:
+                    incident_id, sep, found, _ = searches[i]
+                    incident = self.incidents[incident_id]
+                    incident['searches'] += 1
+                    if found:
+                        incident['status'] = 'found'
+                    else:
+                        groups.setdefault(len(sep), []).append(i)
+
+                for group in groups.values():
+                    ids = [searches[i][0] for i in group]
+                    log_p = np.array([self.incidents[incident_id]['log_p'] for incident_id in ids])
+                    psep = np.array([np.ones(len(log_p[0])) if searches[i][3] is None else searches[i][3] for i in group])
+                    with np.errstate(divide='ignore'):  # Fully searched areas get log(0) = -inf
+                        log_p += np.log1p(-np.array([searches[i][1] for i in group]))  # revise_target_probs
+                        log_p += np.log(psep)
+                    for row, incident_id in enumerate(ids):
+                        self.incidents[incident_id]['log_p'] = log_p[row]
+
+                for i in indexes:
+                    results[i] = self._view(searches[i][0])
+        return results
+
+
+class MicroBatcher:
+    """Worker thread applying searches reported within max_wait seconds of each other in one batch."""
+
+    def __init__(self, store, max_wait=0.002, max_batch=1024):
+        self.store = store
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, incident_id, sep, found=False, psep=None):
+        """Queue search, return Future of the incident view after the search."""
+        future = Future()
+        self._queue.put(((incident_id, sep, found, psep), future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                results = self.store.revise([search for search, _ in batch])
+            except Exception as e:  # Keep serving, every request of the batch gets the error
+                results = [e] * len(batch)
+            self.batches += 1
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """JSON routes of the service, store and batcher are attributes of the server."""
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _route(self):
+        match = re.fullmatch(r'/incidents(?:/(\w+)(/search)?)?', self.path)
+        return (match.group(1), bool(match.group(2))) if match else (None, None)
+
+    def do_GET(self):
+        incident_id, search = self._route()
+        if incident_id is None or search:
+            return self._send(404, {'error': 'Not found'})
+        try:
+            self._send(200, self.server.store.get(incident_id))
+        except KeyError:
+            self._send(404, {'error': f'No incident {incident_id}'})
+
+    def do_POST(self):
+        incident_id, search = self._route()
+        try:
+            body = self._body()
+            if not isinstance(body, dict):
+                return self._send(400, {'error': 'body must be a JSON object'})
+            if incident_id is None and search is False:
+                _, view = self.server.store.create(body.get('priors', PRIORS), body.get('psep'))
+                return self._send(201, view)
+            if not search:
+                return self._send(404, {'error': 'Not found'})
+            if 'sep' not in body:
+                return self._send(400, {'error': 'Missing sep'})
+            _probabilities(body['sep'], 'sep')  # Lengths are checked against the incident by the store
+            if body.get('psep') is not None:
+                _probabilities(body['psep'], 'psep')
+            _found(body.get('found', False))
+            future = self.server.batcher.submit(incident_id, body['sep'], body.get('found', False), body.get('psep'))
+            self._send(200, future.result())
+        except KeyError:
+            self._send(404, {'error': f'No incident {incident_id}'})
+        except (ValueError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+
+    def do_DELETE(self):
+        incident_id, search = self._route()
+        try:
+            if incident_id is None or search:
+                raise KeyError(self.path)
+            self.server.store.delete(incident_id)
+            self._send(200, {'id': incident_id})
+        except KeyError:
+            self._send(404, {'error': f'No incident {incident_id}'})
+
+    def log_message(self, format, *args):
+        pass  # Keep request latency free of logging to stderr
+
+
+class SearchServer(ThreadingHTTPServer):
+    """HTTP server with one thread per request and room for many waiting connections."""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(host='127.0.0.1', port=8765, max_wait=0.002):
+    """Return SearchServer with a store and micro-batcher, port 0 picks a free port."""
+    server = SearchServer((host, port), Handler)
+    server.store = IncidentStore()
+    server.batcher = MicroBatcher(server.store, max_wait)
+    return server
+
+
+def main(host='127.0.0.1', port=8765):
+    server = make_server(host, port)
+    print(f'Serving on http://{host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Constant memory statistics of the number of searches needed to find the sailor."""
+import os
+
+import numpy as np
+
+BINS = 64  # Histogram has one bin per search count 0..BINS-2, the last bin counts everything above
+
+
+class RunningStats:
+    """Count, mean, variance (Welford), min, max and histogram of search counts.
+
+    Memory does not grow with the number of trials, and stats of different workers or
+    chunks can be merged into the same result as one run over all trials.
+    """
+
+    def __init__(self, bins=BINS):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = None
+        self.max = None
+        self.histogram = np.zeros(bins, dtype=np.int64)
+
+    def add(self, value):
+        """Add result of one trial."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.histogram[min(value, len(self.histogram) - 1)] += 1
+
+    def add_batch(self, values):
+        """Add results of many trials."""
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        batch = RunningStats(len(self.histogram))
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = int(values.min())
+        batch.max = int(values.max())
+        batch.histogram += np.bincount(np.minimum(values, len(self.histogram) - 1), minlength=len(self.histogram))
+        self.merge(batch)
+
+    def merge(self, other):
+        """Add all trials of other stats (Chan et al. parallel variance)."""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.histogram += other.histogram
+        return self
+
+    @property
+    def variance(self):
+        """Return sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Return sample standard deviation."""
+        return self.variance ** 0.5
+
+    def percentile(self, q):
+        """Return smallest search count with at least q percent of trials at or below it, None without trials.
+
+        Counts above the second to last bin share the overflow bin, so a percentile falling in it is
+        only known to lie between that bin and max. It saturates to max, an upper bound.
+        """
+        if self.count == 0:
+            return None
+        cumulative = np.cumsum(self.histogram)
+        value = int(np.searchsorted(cumulative, q / 100 * self.count))
+        if value >= len(self.histogram) - 1:
+            return self.max  # In the overflow bin
+        return min(max(value, self.min), self.max)
+
+    def summary(self):
+        """Return dict with all statistics."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+    def to_arrays(self):
+        """Return dict of arrays holding all statistics."""
+        return {
+            'moments': np.array([self.count, self.mean, self.m2]),
+            'extremes': np.array([-1 if self.min is None else self.min, -1 if self.max is None else self.max]),
+            'histogram': self.histogram,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Return stats from arrays made by to_arrays."""
+        stats = cls(len(arrays['histogram']))
+        count, stats.mean, stats.m2 = (float(v) for v in arrays['moments'])
+        stats.count = int(count)
+        low, high = (int(v) for v in arrays['extremes'])
+        stats.min, stats.max = (None, None) if stats.count == 0 else (low, high)
+        stats.histogram = np.array(arrays['histogram'], dtype=np.int64)
+        return stats
+
+    def save(self, path):
+        """Write stats to a compact .npz file, replacing it atomically."""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Return stats saved with save."""
+        with np.load(path) as data:
+            return cls.from_arrays(data)
@@ -0,0 +1,148 @@
+"""Declarative scenario configs and parameter sweeps with results cached on disk.
+
+A sweep file is JSON with a base scenario, a grid of values to try and a seed:
+
+    {
+        "base": {"policy": "once", "num_trials": 100000},
+        "grid": {"priors": [[0.2, 0.5, 0.3], [0.3, 0.4, 0.3]], "effectiveness": [[0.2, 0.9], [0.3, 0.8]]},
+        "seed": 0
+    }
+
+Every combination of grid values is one cell of the sweep. Cell results are saved under a hash of
+the scenario, the simulation code and the seed, so rerunning a sweep, or a sweep that shares cells
+with an earlier one, only simulates the cells that were not run before.
+"""
+import argparse
+import ast
+import hashlib
+import itertools as it
+import json
+import os
+
+import numpy as np
+
+import mcs_batch
+from stats import RunningStats
+
+CACHE_DIR = '.sweep_cache'
+CODE_MODULES = ('mcs_batch', 'stats')  # Modules run by run_scenario, with the local modules they import
+
+DEFAULTS = {
+    'areas': [list(c) for c in mcs_batch.SEARCH_AREAS],  # (UL-X, UL-Y, LR-X, LR-Y) of every search area
+    'priors': list(mcs_batch.PRIORS),
+    'effectiveness': list(mcs_batch.EFFECTIVENESS),  # Range of the uniform daily search effectiveness
+    'sailor_mode': None,  # Mode of the triangular sailor area distribution, None for the middle
+    'cells': None,  # Searchable cells of every area, None for the water cells of the map
+    'policy': 'once',
+    'num_trials': 100_000,
+}
+
+
+def scenario(**values):
+    """Return complete scenario config, values not given are taken from DEFAULTS."""
+    unknown = set(values) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f'Unknown scenario keys: {", ".join(sorted(unknown))}')
+    config = dict(DEFAULTS, **values)
+    if len(config['priors']) != len(config['areas']):
+        raise ValueError(f'{len(config["priors"])} priors for {len(config["areas"])} search areas')
+    if config['cells'] is None:  # Resolved so the counts are part of the cache key
+        config['cells'] = mcs_batch.scenario_cells([tuple(c) for c in config['areas']]).tolist()
+    if len(config['cells']) != len(config['areas']):
+        raise ValueError(f'{len(config["cells"])} cell counts for {len(config["areas"])} search areas')
+    if config['policy'] not in mcs_batch.POLICIES:
+        raise ValueError(f'Unknown policy {config["policy"]!r}')
+    return config
+
+
+def expand(base, grid):
+    """Return scenario configs of every combination of the grid values on top of base."""
+    keys = list(grid)
+    return [scenario(**dict(base, **dict(zip(keys, values)))) for values in it.product(*(grid[k] for k in keys))]
+
+
+def code_files(modules=CODE_MODULES):
+    """Return sorted source files of modules and of every module of this directory they import, directly or not."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    found = set()
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        path = os.path.join(root, f'{name}.py')
+        if name in found or not os.path.exists(path):  # Standard library and installed packages
+            continue
+        found.add(name)
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module.split('.')[0])
+    return [os.path.join(root, f'{name}.py') for name in sorted(found)]
+
+
+def code_version():
+    """Return hash of the simulation source files."""
+    digest = hashlib.sha256()
+    for path in code_files():
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def cache_key(config, seed, version=None):
+    """Return hash identifying the result of simulating config with seed."""
+    text = json.dumps({'config': config, 'seed': seed, 'code': version or code_version()}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def run_scenario(config, seed=0, cache_dir=CACHE_DIR, version=None):
+    """Return RunningStats of config and True if they were read from the cache."""
+    key = cache_key(config, seed, version)
+    path = os.path.join(cache_dir, f'{key}.npz')
+    if os.path.exists(path):
+        return RunningStats.load(path), True
+
+    rng = np.random.default_rng(seed)
+    search_stats = RunningStats()
+    search_stats.add_batch(mcs_batch.run_batch(config['num_trials'], config['policy'], rng,
+                                               areas=[tuple(c) for c in config['areas']], priors=config['priors'],
+                                               effectiveness=tuple(config['effectiveness']),
+                                               sailor_mode=config['sailor_mode'], cells=config['cells']))
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, f'{key}.json'), 'w') as f:  # Readable record of the cell
+        json.dump({'config': config, 'seed': seed, 'code': version or code_version()}, f, indent=2)
+    search_stats.save(path)
+    return search_stats, False
+
+
+def run_sweep(sweep, cache_dir=CACHE_DIR):
+    """Run every cell of sweep (dict or path of a JSON sweep file), return [(config, RunningStats, cached)]."""
+    if isinstance(sweep, str):
+        with open(sweep) as f:
+            sweep = json.load(f)
+    version = code_version()
+    seed = sweep.get('seed', 0)
+    return [(config, *run_scenario(config, seed, cache_dir, version))
+            for config in expand(sweep.get('base', {}), sweep.get('grid', {}))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sweep', help='JSON sweep file')
+    parser.add_argument('--cache', default=CACHE_DIR, help='directory of cached results')
+    args = parser.parse_args()
+
+    with open(args.sweep) as f:
+        sweep = json.load(f)
+    varied = list(sweep.get('grid', {}))
+    for config, search_stats, cached in run_sweep(sweep, args.cache):
+        cell = ', '.join(f'{key}={config[key]}' for key in varied)
+        print(f'{cell}: Average: {search_stats.mean:.4f}, std: {search_stats.std:.4f}'
+              f'{" (cached)" if cached else ""}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+from allocation import allocate, detection, GreedyPolicy
+import itertools as it
+import mcs_batch
+import numpy as np
+import unittest
+
+
+def best_detection(p, effectiveness):
+    """Return probability of detection of the best allocation, trying all of them."""
+    return max(detection(p, np.array(areas) + 1, effectiveness)
+               for areas in it.product(range(len(p)), repeat=len(effectiveness)))
+
+
+class TestAllocation(unittest.TestCase):
+
+    def test_two_assets(self):
+        self.assertEqual(allocate([0.2, 0.5, 0.3], [0.5, 0.5]).areas.tolist(), [2, 3])
+        self.assertEqual(allocate([0.1, 0.8, 0.1], [0.5, 0.5]).areas.tolist(), [2, 2])  # Like searching twice
+        allocation = allocate([0.2, 0.5, 0.3], [0.9, 0.3])
+        self.assertEqual(allocation.areas.tolist(), [2, 3])
+        self.assertAlmostEqual(allocation.detection, 0.5 * 0.9 + 0.3 * 0.3)
+
+    def test_equal_assets_optimal(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            p = rng.dirichlet(np.ones(rng.integers(1, 5)))
+            effectiveness = np.full(rng.integers(1, 5), rng.uniform(0.1, 0.9))
+            allocation = allocate(p, effectiveness)
+            self.assertAlmostEqual(allocation.detection, detection(p, allocation.areas, effectiveness))
+            self.assertAlmostEqual(allocation.detection, best_detection(p, effectiveness))
+
+    def test_per_area_effectiveness(self):
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            p = rng.dirichlet(np.ones(rng.integers(1, 5)))
+            effectiveness = rng.uniform(0.1, 0.9, (rng.integers(1, 5), len(p)))
+            allocation = allocate(p, effectiveness)
+            self.assertAlmostEqual(allocation.detection, detection(p, allocation.areas, effectiveness))
+            self.assertGreaterEqual(allocation.detection, best_detection(p, effectiveness) / 2)
+
+    def test_many(self):
+        rng = np.random.default_rng(2)
+        p = rng.dirichlet(np.ones(300))
+        for effectiveness in (rng.uniform(0.2, 0.9, 300), rng.uniform(0.2, 0.9, (300, 300))):
+            allocation = allocate(p, effectiveness)
+            self.assertEqual(len(allocation.areas), 300)
+            self.assertTrue(((allocation.areas >= 1) & (allocation.areas <= 300)).all())
+
+    def test_greedy_policy(self):
+        p = np.array([[0.2, 0.5, 0.3], [0.1, 0.8, 0.1]])
+        self.assertEqual(GreedyPolicy()(p).tolist(), [6, 2])
+        results = mcs_batch.run_batch(20_000, GreedyPolicy(), np.random.default_rng(0))
+        self.assertLess(abs(results.mean() - 1.885), 0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
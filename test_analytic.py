@@ -0,0 +1,35 @@
+from analytic import cross_check, evaluate
+import unittest
+import numpy as np
+
+
+class TestAnalytic(unittest.TestCase):
+
+    def test_exact_cases(self):
+        area = [(0, 0, 10, 10)]
+        self.assertAlmostEqual(evaluate('twice', area, [1.0], effectiveness=(0.5, 0.5)).mean, 1.0)
+        evaluation = evaluate('twice', area, [1.0], effectiveness=(0.25, 0.25))
+        self.assertAlmostEqual(evaluation.mean, 1.5)  # Half of the area per day
+        self.assertTrue(np.allclose(evaluation.distribution, [0.5, 0.5]))
+
+    def test_distribution(self):
+        evaluation = evaluate('once')
+        self.assertAlmostEqual(evaluation.distribution.sum(), 1.0, places=6)
+        days = np.arange(1, len(evaluation.distribution) + 1)
+        self.assertAlmostEqual((days * evaluation.distribution).sum(), evaluation.mean, places=6)
+
+    def test_cross_check(self):
+        for policy in ('once', 'twice'):
+            analytic, simulated, error = cross_check(policy, 100_000, seed=4)
+            self.assertLess(abs(analytic - simulated), 4 * error)
+        analytic, simulated, error = cross_check('once', 100_000, seed=4, priors=(0.6, 0.2, 0.2))
+        self.assertLess(abs(analytic - simulated), 4 * error)
+
+    def test_max_days(self):
+        with self.assertWarns(RuntimeWarning):
+            evaluation = evaluate('once', max_days=2)
+        self.assertLess(evaluation.mean, evaluate('once').mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
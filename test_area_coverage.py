@@ -0,0 +1,35 @@
+from area_coverage import AreaCoverage
+import unittest
+import numpy as np
+
+
+class TestAreaCoverage(unittest.TestCase):
+
+    def test_search(self):
+        cover = AreaCoverage(np.zeros((50, 40)))
+        coords = cover.search(0.5)
+        self.assertEqual(len(coords), 1000)
+        self.assertEqual(coords[:2].tolist(), [[0, 0], [0, 1]])  # Same order as it.product(x_range, y_range)
+        self.assertTrue(cover.is_searched(0, 49))
+        self.assertFalse(cover.is_searched(39, 49))
+        self.assertEqual(cover.fraction, 0.5)
+
+    def test_exhausted(self):
+        cover = AreaCoverage(np.zeros((50, 50)), shuffle=True)
+        first = cover.search(0.7)
+        second = cover.search(0.7)
+        self.assertEqual(len(first) + len(second), cover.cells)
+        self.assertEqual(len(set(map(tuple, first)) | set(map(tuple, second))), cover.cells)
+        self.assertTrue(cover.exhausted)
+        self.assertEqual(len(cover.search(0.5)), 0)
+
+    def test_valid_cells(self):
+        cover = AreaCoverage(np.zeros((10, 10)), shuffle=True, valid=[3, 14, 15, 92])
+        self.assertEqual(cover.cells, 4)
+        coords = cover.search(1.0)
+        self.assertEqual(sorted(map(tuple, coords.tolist())), [(0, 3), (1, 4), (1, 5), (9, 2)])
+        self.assertTrue(cover.exhausted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+from checkpoint import run_campaign, load_checkpoint
+from parallel import run_parallel
+import os
+import tempfile
+import unittest
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'campaign.npz')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_extend_matches_uninterrupted_run(self):
+        run_campaign(self.path, 20000, seed=5, block_size=5000)
+        config, blocks_done, _ = load_checkpoint(self.path)
+        self.assertEqual((config['seed'], blocks_done), (5, 4))
+        extended = run_campaign(self.path, 40000, block_size=5000)
+        whole = run_campaign(os.path.join(self.tmp.name, 'whole.npz'), 40000, seed=5, block_size=5000)
+        self.assertEqual(extended.summary(), whole.summary())
+        self.assertEqual(extended.histogram.tolist(), whole.histogram.tolist())
+        self.assertEqual(whole.summary(), run_parallel(40000, seed=5, workers=1, block_size=5000).summary())
+
+    def test_config_mismatch(self):
+        run_campaign(self.path, 5000, seed=5, block_size=5000)
+        with self.assertRaises(ValueError):
+            run_campaign(self.path, 10000, policy='twice', block_size=5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
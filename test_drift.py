@@ -0,0 +1,60 @@
+from drift import Drift, _fast_size
+from bayes_rule_MCS import Search, run_trial, monte_carlo_once
+import unittest
+import numpy as np
+
+
+class TestDrift(unittest.TestCase):
+
+    def test_fast_size(self):
+        self.assertEqual([_fast_size(n) for n in (1, 7, 11, 100, 381, 1001)], [1, 8, 12, 100, 384, 1024])
+
+    def test_advance(self):
+        drift = Drift((3, -2), 1.5)
+        grid = np.zeros((60, 80))
+        grid[30, 40] = 1.0
+        moved = drift.advance(grid)
+        ys, xs = np.indices(grid.shape)
+        self.assertAlmostEqual(moved.sum(), 1.0)
+        self.assertAlmostEqual((moved * xs).sum(), 43, places=3)
+        self.assertAlmostEqual((moved * ys).sum(), 28, places=3)
+        self.assertAlmostEqual((moved * (xs - 43) ** 2).sum(), 1.5 ** 2, places=2)
+
+    def test_advance_mask(self):
+        grid = np.full((20, 20), 1 / 400)
+        mask = np.ones((20, 20), dtype=bool)
+        mask[:, 10:] = False  # Land on the right half
+        moved = Drift((0, 0), 0).advance(grid, mask)
+        self.assertAlmostEqual(moved.sum(), 1.0)
+        self.assertEqual(moved[:, 10:].sum(), 0)
+
+    def test_move(self):
+        rng = np.random.default_rng(0)
+        drift = Drift((5, 0), 0)
+        self.assertEqual(drift.move(10, 10, rng, (20, 20)), (15, 10))
+        self.assertEqual(drift.move(17, 10, rng, (20, 20)), (17, 10))  # Would leave the map
+        mask = np.ones((20, 20), dtype=bool)
+        mask[10, 15] = False
+        self.assertEqual(drift.move(10, 10, rng, (20, 20), mask), (10, 10))  # Would go on land
+
+
+class TestDriftingSearch(unittest.TestCase):
+
+    def test_drift_target(self):
+        corners = [(0, 0, 10, 10), (10, 0, 20, 10)]
+        app = Search('test', np.random.default_rng(0), headless=True, areas=corners, priors=[0.5, 0.5],
+                     drift=Drift((10, 0), 0))
+        app.area_actual, app.sailor_actual, app.sailor_position = 1, [3, 4], (3, 4)
+        app.drift_target()
+        self.assertEqual((app.area_actual, app.sailor_actual, app.sailor_position), (2, [3, 4], (13, 4)))
+        np.testing.assert_allclose(app.p, [0.0, 1.0], atol=1e-12)  # Area 1 drifted into area 2, area 2 off the map
+
+    def test_run_trial(self):
+        rng = np.random.default_rng(0)
+        app = Search('test', rng, headless=True, drift=Drift((0.5, 0.5), 1.0))
+        app.sailor_final_location(num_search_areas=3)
+        self.assertTrue(1 <= run_trial(app, rng, monte_carlo_once, max_searches=50) <= 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
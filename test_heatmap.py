@@ -0,0 +1,68 @@
+from heatmap import accumulate, accumulate_trajectories, cell_coordinates, overlay, render_report
+from trajectories import TrajectoryRecorder, TrajectoryReader
+import mcs_batch
+import map_cache
+import render
+import os
+import tempfile
+import unittest
+import numpy as np
+
+AREAS = [(10, 20, 14, 23), (0, 0, 2, 2)]
+
+
+class TestHeatmap(unittest.TestCase):
+
+    def test_accumulate(self):
+        x, y = cell_coordinates(AREAS, np.array([0, 0, 1]), np.array([0, 4, 3]))
+        self.assertEqual((x.tolist(), y.tolist()), ([10, 11, 1], [20, 21, 1]))  # Cells numbered down columns
+        counts = accumulate((30, 30), AREAS, np.array([0, 0, 1]), np.array([0, 0, 3]))
+        counts = accumulate((30, 30), AREAS, np.array([1]), np.array([3]), counts=counts)
+        self.assertEqual((counts[20, 10], counts[1, 1], counts.sum()), (2, 2, 4))
+        days = accumulate((30, 30), AREAS, np.array([0, 1]), np.array([0, 3]), np.array([3, 5]))
+        self.assertEqual((days[20, 10], days[1, 1]), (3, 5))
+
+    def test_trajectories(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with TrajectoryRecorder(tmp, 3) as recorder:
+                results = mcs_batch.run_batch(1000, 'once', np.random.default_rng(0), recorder=recorder)
+            counts, days = accumulate_trajectories(TrajectoryReader(tmp), (380, 500), mcs_batch.SEARCH_AREAS, 300)
+        self.assertEqual((counts.sum(), days.sum()), (1000, results.sum()))
+
+    def test_water(self):
+        water = map_cache.water_cells(map_cache.water_mask('cape.png'), mcs_batch.SEARCH_AREAS)
+        with tempfile.TemporaryDirectory() as tmp:
+            with TrajectoryRecorder(tmp, 3) as recorder:
+                mcs_batch.run_batch(1000, 'once', np.random.default_rng(0), recorder=recorder,
+                                    cells=[len(c) for c in water])
+            counts, _ = accumulate_trajectories(TrajectoryReader(tmp), (380, 500), mcs_batch.SEARCH_AREAS, 300,
+                                                water)
+        self.assertEqual(counts.sum(), 1000)
+        self.assertEqual(counts[~map_cache.water_mask('cape.png')].sum(), 0)  # No sailor found on land
+        last = accumulate((380, 500), mcs_batch.SEARCH_AREAS, np.array([2]), np.array([len(water[2]) - 1]),
+                          water=water)
+        self.assertEqual(last[254, 154], 1)  # Last water cell of area 3, its last cell is water
+
+    def test_overlay(self):
+        values = np.zeros((4, 4))
+        values[1, 2] = 1
+        img = overlay(None, values)
+        self.assertEqual(img.shape, (4, 4, 3))
+        self.assertTrue((img[0, 0] == 255).all())
+        self.assertEqual(img[1, 2].tolist(), [102, 102, 255])  # Highest value blended as red
+
+    def test_offscreen_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = accumulate((380, 500), [(130, 265, 180, 315)], np.zeros(100, dtype=int), np.arange(100))
+            files = render_report(counts, counts * 2, counts, prefix=os.path.join(tmp, 'report'))
+            self.assertEqual(len(files), 3)
+            img = render.get_backend('opencv').load(files[0])
+            self.assertEqual(img.shape, (380, 500, 3))
+
+            offscreen = render.OffscreenBackend(tmp)
+            offscreen.show('Search Area', map_cache.load_map('cape.png'), 1000)
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'Search_Area_00000.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+from instrument import Profiler, ProgressReporter
+import io
+import unittest
+
+
+class Counter:
+
+    def step(self, n):
+        return n + 1
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_instrument(self):
+        original = Counter.step
+        with Profiler(sample_every=4) as profiler:
+            profiler.instrument(Counter, 'step')
+            counter = Counter()
+            self.assertEqual([counter.step(i) for i in range(10)], list(range(1, 11)))
+            profiler.count('steps', 10)
+        self.assertIs(Counter.step, original)  # Removed when the profiler exits
+        summary = profiler.summary()
+        self.assertEqual(summary['phases']['Counter.step']['calls'], 10)
+        self.assertEqual(summary['phases']['Counter.step']['timed_calls'], 2)
+        self.assertEqual(summary['counters'], {'steps': 10})
+
+
+class TestProgressReporter(unittest.TestCase):
+
+    def test_update(self):
+        stream = io.StringIO()
+        progress = ProgressReporter(100, interval=3600, stream=stream)
+        for done in range(1, 101):
+            progress.update(done)
+        self.assertEqual(stream.getvalue().count('\n'), 1)  # Only the final report
+        self.assertTrue(stream.getvalue().startswith('I: 100/100'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import map_cache
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestMapCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.map_file = os.path.join(self.tmp, 'cape.png')
+        shutil.copy('cape.png', self.map_file)
+        map_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_load_map_once(self):
+        img = map_cache.load_map(self.map_file)
+        self.assertIs(map_cache.load_map(self.map_file), img)
+        self.assertFalse(img.flags.writeable)
+        area = map_cache.search_areas(img, [(130, 265, 180, 315)])[0]
+        self.assertEqual(area.shape, (50, 50, 3))
+        self.assertFalse(area.flags.writeable)
+
+    def test_reload_changed_map(self):
+        img = map_cache.load_map(self.map_file)
+        stat = os.stat(self.map_file)
+        os.utime(self.map_file, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNot(map_cache.load_map(self.map_file), img)
+
+    def test_base_layer_once(self):
+        layer = map_cache.base_layer(self.map_file, [(130, 265, 180, 315)], (160, 290))
+        self.assertIs(map_cache.base_layer(self.map_file, [(130, 265, 180, 315)], (160, 290)), layer)
+        self.assertFalse(layer.flags.writeable)
+        self.assertFalse((layer == map_cache.load_map(self.map_file)).all())  # Annotations were drawn
+        self.assertIsNot(map_cache.base_layer(self.map_file, [(80, 255, 130, 305)], (160, 290)), layer)
+
+    def test_water_mask_cached(self):
+        mask = map_cache.water_mask(self.map_file)
+        self.assertFalse(mask.flags.writeable)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, 'cape.water.npz')))
+        map_cache.clear()
+        self.assertTrue((map_cache.water_mask(self.map_file) == mask).all())  # Read back from the file
+        cells = map_cache.water_cells(mask, [(130, 265, 180, 315), (80, 255, 130, 305), (105, 205, 155, 255)])
+        self.assertEqual([len(c) for c in cells], [2500, 2500, 2492])
+
+    def test_missing_map(self):
+        self.assertIsNone(map_cache.load_map(os.path.join(self.tmp, 'missing.png')))
+        self.assertIsNone(map_cache.base_layer(os.path.join(self.tmp, 'missing.png'), [], (0, 0)))
+        self.assertIsNone(map_cache.water_mask(os.path.join(self.tmp, 'missing.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
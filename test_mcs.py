@@ -1,5 +1,6 @@
-from bayes_rule_MCS import monte_carlo_twice, monte_carlo_once
+from bayes_rule_MCS import monte_carlo_twice, monte_carlo_once, menu_options, Search
 import unittest
+import numpy as np
 
 
 class TestMCS(unittest.TestCase):
@@ -23,6 +24,26 @@ class TestMCS(unittest.TestCase):
         self.assertIn(monte_carlo_once(0.2, 0.2, 0.6), [5, 6])
         self.assertIn(monte_carlo_once(0.2, 0.6, 0.2), [4, 6])
         self.assertIn(monte_carlo_once(0.6, 0.2, 0.2), [4, 5])
+    def test_many_areas(self):
+        self.assertEqual(monte_carlo_twice(0.1, 0.2, 0.4, 0.3), 3)
+        self.assertEqual(menu_options(4)[monte_carlo_once(0.1, 0.2, 0.4, 0.3) - 1], (3, 4))
+        self.assertEqual(menu_options(4)[monte_carlo_once(0.4, 0.1, 0.1, 0.4) - 1], (1, 4))
+        self.assertIn(menu_options(4)[monte_carlo_once(0.4, 0.2, 0.2, 0.2) - 1], [(1, 2), (1, 3), (1, 4)])
+
+
+class TestSearch(unittest.TestCase):
+
+    def test_revise_target_probs(self):
+        corners = [(0, 0, 10, 10), (10, 0, 20, 10), (20, 0, 30, 20), (0, 10, 10, 30)]
+        app = Search('test', np.random.default_rng(0), headless=True, areas=corners, priors=[0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(app.areas[2].shape[:2], (20, 10))
+        app.sep = np.array([0.5, 0.0, 1.0, 0.5])
+        app.revise_target_probs()
+        np.testing.assert_allclose(app.p, np.array([0.05, 0.2, 0.0, 0.2]) / 0.45)
+        x, y = app.sailor_final_location(num_search_areas=4)
+        corner = corners[app.area_actual - 1]
+        self.assertTrue(corner[0] <= x < corner[2] and corner[1] <= y < corner[3])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
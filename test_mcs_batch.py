@@ -0,0 +1,57 @@
+from mcs_batch import (batch_monte_carlo_twice, batch_monte_carlo_once, run_batch, RandomScenarios, area_cells,
+                       water_cells)
+from decisions import monte_carlo_once, monte_carlo_twice
+import unittest
+import numpy as np
+
+
+class TestMCSBatch(unittest.TestCase):
+
+    def test_batch_monte_carlo_twice(self):
+        rng = np.random.default_rng(0)
+        p = np.array([[0.1, 0.3, 0.6], [0.4, 0.3, 0.3], [0.1, 0.7, 0.2]])
+        self.assertEqual(batch_monte_carlo_twice(p, rng).tolist(), [3, 1, 2])
+        ties = batch_monte_carlo_twice(np.tile([0.2, 0.4, 0.4], (1000, 1)), rng)
+        self.assertEqual(set(ties.tolist()), {2, 3})
+
+    def test_batch_monte_carlo_once(self):
+        rng = np.random.default_rng(0)
+        p = np.array([[0.1, 0.3, 0.6], [0.4, 0.3, 0.4], [0.4, 0.4, 0.2], [0.2, 0.4, 0.4]])
+        self.assertEqual(batch_monte_carlo_once(p, rng).tolist(), [6, 5, 4, 6])
+        ties = batch_monte_carlo_once(np.tile([0.2, 0.2, 0.6], (1000, 1)), rng)
+        self.assertEqual(set(ties.tolist()), {5, 6})
+        ties = batch_monte_carlo_once(np.tile([0.33, 0.33, 0.33], (1000, 1)), rng)
+        self.assertEqual(set(ties.tolist()), {4, 5, 6})
+
+    def test_many_areas(self):
+        rng = np.random.default_rng(0)
+        p = np.array([[0.1, 0.2, 0.4, 0.3], [0.4, 0.1, 0.1, 0.4]])
+        self.assertEqual(batch_monte_carlo_once(p, rng).tolist(), [monte_carlo_once(*row) for row in p])
+        self.assertEqual(batch_monte_carlo_twice(p[:1], rng).tolist(), [monte_carlo_twice(*p[0])])
+        ties = batch_monte_carlo_once(np.tile([0.05, 0.3, 0.05, 0.3, 0.3], (1000, 1)), rng)
+        self.assertEqual(set(ties.tolist()), {monte_carlo_once(0.05, 0.3, 0.05, 0.3, 0.3) for _ in range(1000)})
+        counts = np.bincount(batch_monte_carlo_once(np.tile([0.4, 0.2, 0.2, 0.2], (30000, 1)), rng))
+        self.assertTrue(np.allclose(counts[[5, 6, 7]] / 30000, 1 / 3, atol=0.02))  # Uniform runner-up
+
+    def test_run_batch(self):
+        results = run_batch(20000, 'once', np.random.default_rng(1), chunk_size=5000)
+        self.assertEqual(len(results), 20000)
+        self.assertTrue((results >= 1).all())
+        self.assertAlmostEqual(results.mean(), 1.88, delta=0.05)  # Scalar bayes_rule_MCS.main average
+        same = run_batch(20000, 'once', np.random.default_rng(1), chunk_size=5000)
+        self.assertTrue((results == same).all())
+
+    def test_water_cells(self):
+        scenarios = RandomScenarios(10, np.random.default_rng(0))
+        self.assertEqual(scenarios.cells.tolist(), water_cells().tolist())
+        self.assertTrue((scenarios.loc < scenarios.cells[scenarios.area]).all())
+        areas = [(60, 0, 70, 10), (0, 300, 10, 301)]
+        with self.assertRaises(ValueError):
+            run_batch(10, 'once', np.random.default_rng(0), areas=areas, priors=[0.5, 0.5])  # Land only
+        results = run_batch(10, 'once', np.random.default_rng(0), areas=areas, priors=[0.5, 0.5],
+                            cells=area_cells(areas))
+        self.assertEqual(len(results), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+from parallel import run_parallel
+import unittest
+import numpy as np
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_same_seed_any_worker_count(self):
+        serial = run_parallel(30000, 'once', seed=7, workers=1, block_size=4000)
+        pooled = run_parallel(30000, 'once', seed=7, workers=3, block_size=4000)
+        self.assertEqual(serial.summary(), pooled.summary())
+        self.assertEqual(serial.histogram.tolist(), pooled.histogram.tolist())
+        self.assertEqual(serial.count, 30000)
+        self.assertAlmostEqual(serial.mean, 1.88, delta=0.05)
+
+    def test_seed_sequence_reused(self):
+        seed_seq = np.random.SeedSequence(5)
+        first = run_parallel(10000, 'once', seed=seed_seq, workers=1, block_size=4000)
+        second = run_parallel(10000, 'once', seed=seed_seq, workers=1, block_size=4000)
+        self.assertEqual(first.histogram.tolist(), second.histogram.tolist())
+        self.assertEqual(seed_seq.n_children_spawned, 0)
+
+    def test_different_seeds(self):
+        self.assertNotEqual(run_parallel(10000, 'twice', seed=1, workers=1).mean,
+                            run_parallel(10000, 'twice', seed=2, workers=1).mean)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+from planner import Planner
+import mcs_batch
+import variance
+import numpy as np
+import unittest
+import warnings
+
+
+class TestPlanner(unittest.TestCase):
+
+    def test_first_day(self):
+        planner = Planner()
+        self.assertEqual(planner.choose([0, 0, 0]), 6)  # Areas 2 and 3 have the highest priors
+        self.assertGreater(planner.expected_searches([0, 0, 0]), 1)
+
+    def test_searched_area_is_skipped(self):
+        planner = Planner(priors=(0.3, 0.4, 0.3))
+        self.assertEqual(planner.choose([0, 1, 0]), 5)  # Areas 1 and 3
+        self.assertEqual(planner.choose([1, 1, 0]), 3)  # Only area 3 is left
+
+    def test_all_searched(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(Planner().choose([1, 1, 1]), 1)
+            self.assertEqual(Planner().expected_searches([1, 1, 1]), 1.0)
+
+    def test_effectiveness(self):
+        self.assertTrue(np.allclose(Planner(effectiveness=(0.5, 0.8)).effectiveness, [0.55, 0.65, 0.75]))
+        self.assertLess(Planner(effectiveness=(0.8, 0.9)).expected_searches([0, 0, 0]),
+                        Planner().expected_searches([0, 0, 0]))
+
+    def test_memo(self):
+        planner = Planner(cache_size=50)
+        planner.choose([0, 0, 0])
+        self.assertLessEqual(len(planner._memo), 50)
+        misses = planner.misses
+        planner.choose([0, 0, 0])
+        self.assertEqual(planner.misses, misses)
+        self.assertGreater(planner.hit_rate, 0)
+
+    def test_batch(self):
+        planner = Planner()
+        coverage = np.array([[0, 0, 0], [0.5, 0.5, 0], [0, 0, 0]])
+        choices = planner(np.ones((3, 3)) / 3, None, coverage=coverage)
+        self.assertEqual(list(choices), [planner.choose(c) for c in coverage])
+        results = mcs_batch.run_batch(20000, planner, np.random.default_rng(0))
+        self.assertAlmostEqual(results.mean(), 1.88, delta=0.05)
+
+    def test_beats_greedy(self):
+        # Sailor areas drawn with mode 1 have probabilities 5/9, 3/9, 1/9, and weak searches
+        priors, effectiveness = (5 / 9, 3 / 9, 1 / 9), (0.1, 0.5)
+        comparison = variance.compare({'once': 'once', 'twice': 'twice',
+                                       'planner': Planner(priors, effectiveness=effectiveness)},
+                                      5000, seed=0, priors=priors, effectiveness=effectiveness, sailor_mode=1)
+        gain = comparison.differences['planner']
+        self.assertLess(gain.mean + 5 * gain.std_error, 0)  # Fewer searches than once, beyond the MC error
+        self.assertLess(comparison.estimates['planner'].mean, comparison.estimates['twice'].mean)
+
+    def test_many_areas(self):
+        priors = np.full(30, 1 / 30)
+        planner = Planner(priors=priors, horizon=2)
+        self.assertIn(planner.choose(np.zeros(30)), range(1, len(planner.options) + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+from bayes_rule import Search, play
+from drift import Drift
+from unittest import mock
+import random
+import unittest
+import numpy as np
+
+
+class TestPlay(unittest.TestCase):
+
+    def test_drift(self):
+        random.seed(0)
+        np.random.seed(0)
+        choices = ['1'] * 20 + ['7']  # Search area 1 twice, then start over if the sailor was not found
+        with mock.patch('builtins.input', side_effect=choices) as prompt, \
+                mock.patch.object(Search, 'drift_target', autospec=True, side_effect=Search.drift_target) as moved, \
+                mock.patch('builtins.print'):
+            play(Drift((2, 1), 1.0), backend='headless')
+        self.assertGreaterEqual(moved.call_count, 1)
+        self.assertEqual(moved.call_count, min(prompt.call_count, 20))  # The sailor drifts after every search
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+from posterior import PosteriorGrid, TargetProbs, normalize_log
+import unittest
+import numpy as np
+
+AREAS = [(0, 0, 10, 10), (10, 0, 20, 10), (0, 10, 20, 30)]
+
+
+class TestPosteriorGrid(unittest.TestCase):
+
+    def test_priors(self):
+        grid = PosteriorGrid((40, 30), AREAS, [0.2, 0.5, 0.3])
+        np.testing.assert_allclose(grid.area_probs(), [0.2, 0.5, 0.3])
+        self.assertAlmostEqual(grid.rect_prob((0, 0, 30, 40)), 1.0)
+        self.assertAlmostEqual(grid.rect_prob((20, 0, 30, 40)), 0.0)
+
+    def test_update_area(self):
+        grid = PosteriorGrid((40, 30), AREAS, [0.2, 0.5, 0.3])
+        half = np.column_stack(np.divmod(np.arange(50), 10))  # Local x, y of half of area 2
+        grid.update_area(2, half, detection_prob=0.8)
+        p = np.array([0.2, 0.5 * (0.5 + 0.5 * 0.2), 0.3])
+        np.testing.assert_allclose(grid.area_probs(), p / p.sum())
+        np.testing.assert_allclose(grid.area_probs(), [grid.grid[:10, :10].sum(), grid.grid[:10, 10:20].sum(),
+                                                        grid.grid[10:30, :20].sum()])
+
+    def test_best_cells(self):
+        grid = PosteriorGrid((40, 30), AREAS, [0.2, 0.5, 0.3])
+        cells = grid.best_cells(5)
+        self.assertTrue(((cells[:, 0] >= 10) & (cells[:, 0] < 20) & (cells[:, 1] < 10)).all())
+
+
+class TestTargetProbs(unittest.TestCase):
+
+    def test_long_search(self):
+        target = TargetProbs([0.2, 0.5, 0.3])
+        for _ in range(2000):  # Multiplying probabilities would underflow to 0 long before
+            target.revise([0.9, 0.5, 0.0])
+        np.testing.assert_allclose(target.probs, [0.0, 0.0, 1.0])
+        target.revise([0.0, 0.0, 0.5])
+        self.assertEqual(target.probs[2], 1.0)
+        for _ in range(2000):
+            target.revise([0.0, 0.0, 0.9])
+        self.assertAlmostEqual(target.probs[1], 1.0)  # Area 2 was searched less hard than area 3
+
+    def test_weight(self):
+        target = TargetProbs([0.2, 0.5, 0.3])
+        target.weight([0.5, 0.2, 0.5])
+        np.testing.assert_allclose(target.probs, np.array([0.1, 0.1, 0.15]) / 0.35)
+        self.assertFalse(target.probs.flags.writeable)
+
+    def test_all_searched(self):
+        target = TargetProbs([0.2, 0.5, 0.3])
+        target.revise([1.0, 1.0, 1.0])
+        np.testing.assert_allclose(target.probs, [1 / 3] * 3)
+        np.testing.assert_allclose(normalize_log([[0.0, -np.inf], [-np.inf, -np.inf]]), [[1, 0], [0.5, 0.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+from service import IncidentStore, detection_table, make_server
+from decisions import detection_probabilities
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import numpy as np
+
+
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = make_server(port=0)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def call(self, method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.url + path, data, method=method)
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    def test_detection_table(self):
+        p = np.array([[0.2, 0.5, 0.3], [0.1, 0.0, 0.6]])
+        self.assertTrue(np.allclose(detection_table(p), [detection_probabilities(row) for row in p]))
+
+    def test_revise(self):
+        store = IncidentStore()
+        first, _ = store.create()
+        second, _ = store.create((0.5, 0.5))
+        results = store.revise([(first, [0.5, 0.5, 0], False, None), (second, [1, 1], False, None),
+                                (first, [0, 0, 0.5], True, None), ('missing', [0, 0], False, None)])
+        self.assertTrue(np.allclose(results[0]['p'], np.array([0.1, 0.25, 0.3]) / 0.65))
+        self.assertEqual(results[1]['p'], [0.5, 0.5])  # Like revise_target_probs when every area is searched
+        self.assertEqual((results[2]['status'], results[2]['searches']), ('found', 2))
+        self.assertIsInstance(results[3], KeyError)
+
+    def test_psep_normalized(self):
+        store = IncidentStore()
+        incident_id, view = store.create(psep=[0.5, 0.5, 0.5])
+        self.assertTrue(np.allclose(view['p'], [0.2, 0.5, 0.3]))
+        view = store.revise([(incident_id, [0.5, 0, 0], False, [1, 0.5, 1])])[0]
+        expected = np.array([0.1, 0.25, 0.3])
+        self.assertTrue(np.allclose(view['p'], expected / expected.sum()))
+        self.assertTrue(np.allclose(view['detection'], detection_probabilities(expected / expected.sum())))
+
+    def test_invalid_search_fails_alone(self):
+        store = IncidentStore()
+        first, _ = store.create()
+        second, _ = store.create()
+        results = store.revise([(first, [0.5, 0, 0], False, None), (second, ['x', 0, 0], False, None),
+                                (second, 0.5, False, None), (second, [1.5, 0, 0], False, None),
+                                (second, [0.5, 0, 0], False, [0.5, 0.5])])
+        self.assertTrue(np.allclose(results[0]['p'], np.array([0.1, 0.5, 0.3]) / 0.9))
+        self.assertEqual(results[0]['searches'], 1)
+        for result in results[1:]:
+            self.assertIsInstance(result, ValueError)
+        self.assertEqual(store.get(second)['searches'], 0)
+        self.assertIsInstance(store.revise([(second, [0.5, 0, 0], 'false', None)])[0], ValueError)
+        with self.assertRaises(ValueError):
+            store.create([])
+        self.assertEqual(len(store.incidents), 2)
+
+    def test_http(self):
+        incident = self.call('POST', '/incidents', {'priors': [0.2, 0.5, 0.3]})
+        self.assertEqual(len(incident['detection']), 6)
+        path = f'/incidents/{incident["id"]}'
+        with ThreadPoolExecutor(8) as pool:
+            views = list(pool.map(lambda _: self.call('POST', f'{path}/search', {'sep': [0.5, 0, 0]}), range(16)))
+        self.assertEqual(sorted(v['searches'] for v in views), list(range(1, 17)))
+        p = self.call('GET', path)['p']
+        expected = np.array([0.2 * 0.5 ** 16, 0.5, 0.3])
+        self.assertTrue(np.allclose(p, expected / expected.sum()))
+
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.call('POST', f'{path}/search', {'sep': [0.5, 0]})
+        self.assertEqual(error.exception.code, 400)
+        for sep in (['x', 0, 0], 0.5, [1.5, 0, 0]):
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                self.call('POST', f'{path}/search', {'sep': sep})
+            self.assertEqual(error.exception.code, 400)
+        self.assertEqual(self.call('GET', path)['searches'], 16)
+        for body in ({'sep': [0.5, 0, 0], 'found': 'false'}, {'sep': [0.5, 0, 0], 'found': 0.0}, [0.5, 0, 0], 0.5):
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                self.call('POST', f'{path}/search', body)
+            self.assertEqual(error.exception.code, 400)
+        self.assertEqual(self.call('GET', path)['status'], 'searching')
+        for body in ({'priors': []}, [0.2, 0.8]):
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                self.call('POST', '/incidents', body)
+            self.assertEqual(error.exception.code, 400)
+        self.call('DELETE', path)
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.call('GET', path)
+        self.assertEqual(error.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
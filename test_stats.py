@@ -0,0 +1,57 @@
+from stats import RunningStats
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+class TestRunningStats(unittest.TestCase):
+
+    def setUp(self):
+        self.values = np.random.default_rng(0).integers(1, 12, 1000)
+
+    def test_add(self):
+        s = RunningStats(bins=8)
+        for v in self.values:
+            s.add(int(v))
+        self.assertEqual(s.count, 1000)
+        self.assertAlmostEqual(s.mean, self.values.mean())
+        self.assertAlmostEqual(s.variance, self.values.var(ddof=1))
+        self.assertEqual((s.min, s.max), (self.values.min(), self.values.max()))
+        self.assertEqual(s.histogram[-1], (self.values >= 7).sum())  # Overflow bin
+        self.assertEqual(s.percentile(50), int(np.percentile(self.values, 50, method='inverted_cdf')))
+
+    def test_percentile(self):
+        s = RunningStats(bins=8)
+        self.assertIsNone(s.percentile(50))
+        s.add_batch(self.values)
+        self.assertEqual(s.percentile(0), s.min)
+        self.assertEqual(s.percentile(100), s.max)
+        self.assertEqual(s.percentile(30), int(np.percentile(self.values, 30, method='inverted_cdf')))
+        self.assertEqual(s.percentile(70), s.max)  # 8 falls in the overflow bin of counts 7 and above
+
+    def test_merge(self):
+        whole = RunningStats()
+        whole.add_batch(self.values)
+        parts = RunningStats()
+        for chunk in np.array_split(self.values, 7):
+            part = RunningStats()
+            part.add_batch(chunk)
+            parts.merge(part)
+        self.assertAlmostEqual(parts.mean, whole.mean)
+        self.assertAlmostEqual(parts.variance, whole.variance)
+        self.assertEqual(parts.histogram.tolist(), whole.histogram.tolist())
+
+    def test_save_load(self):
+        s = RunningStats()
+        s.add_batch(self.values)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.npz')
+            s.save(path)
+            loaded = RunningStats.load(path)
+        self.assertEqual(loaded.summary(), s.summary())
+        self.assertEqual(loaded.histogram.tolist(), s.histogram.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import mcs_batch
+from sweep import cache_key, code_files, expand, run_sweep, scenario
+import os
+import tempfile
+import unittest
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand(self):
+        configs = expand({'num_trials': 10}, {'priors': [[0.2, 0.5, 0.3], [0.3, 0.4, 0.3]], 'policy': ['once', 'twice']})
+        self.assertEqual(len(configs), 4)
+        self.assertEqual(configs[1]['policy'], 'twice')
+        self.assertEqual(configs[0]['effectiveness'], [0.2, 0.9])
+        with self.assertRaises(ValueError):
+            scenario(prior=[1.0])
+        with self.assertRaises(ValueError):
+            scenario(priors=[0.5, 0.5])
+
+    def test_cache_key(self):
+        config = scenario()
+        self.assertEqual(config['cells'], mcs_batch.water_cells().tolist())
+        self.assertNotEqual(cache_key(config, 0, 'v1'), cache_key(dict(config, cells=[10000] * 3), 0, 'v1'))
+        self.assertEqual(cache_key(config, 0, 'v1'), cache_key(dict(reversed(config.items())), 0, 'v1'))
+        self.assertNotEqual(cache_key(config, 0, 'v1'), cache_key(config, 1, 'v1'))
+        self.assertNotEqual(cache_key(config, 0, 'v1'), cache_key(config, 0, 'v2'))
+
+    def test_code_files(self):
+        names = {os.path.basename(path) for path in code_files()}
+        self.assertTrue({'mcs_batch.py', 'posterior.py', 'stats.py', 'map_cache.py', 'decisions.py'} <= names)
+        self.assertNotIn('sweep.py', names)
+
+    def test_reuse_cells(self):
+        sweep = {'base': {'num_trials': 5000}, 'grid': {'effectiveness': [[0.2, 0.9], [0.5, 0.9]]}, 'seed': 3}
+        first = run_sweep(sweep, self.tmp.name)
+        self.assertEqual([cached for *_, cached in first], [False, False])
+        self.assertGreater(first[0][1].mean, first[1][1].mean)  # More effective searches find sooner
+        self.assertAlmostEqual(first[0][1].mean, 1.88, delta=0.1)
+
+        sweep['grid']['effectiveness'].append([0.3, 0.9])  # Overlapping sweep
+        second = run_sweep(sweep, self.tmp.name)
+        self.assertEqual([cached for *_, cached in second], [True, True, False])
+        self.assertEqual(second[0][1].summary(), first[0][1].summary())
+        self.assertEqual(len([f for f in os.listdir(self.tmp.name) if f.endswith('.npz')]), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+from tournament import run_tournament
+import unittest
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_ranking(self):
+        result = run_tournament({'twice': 'twice', 'once': 'once'}, seed=3)
+        self.assertTrue(result.settled)
+        self.assertEqual([s.name for s in result.standings], ['once', 'twice'])
+        self.assertLess(result.trials, 1_000_000)
+
+    def test_same_policy_is_not_settled(self):
+        result = run_tournament({'a': 'once', 'b': 'once'}, seed=3, batch_size=5000, max_trials=20000)
+        self.assertFalse(result.settled)
+        self.assertEqual(result.trials, 20000)
+
+    def test_reproducible(self):
+        first = run_tournament({'once': 'once', 'twice': 'twice'}, seed=11, max_trials=30000)
+        second = run_tournament({'once': 'once', 'twice': 'twice'}, seed=11, max_trials=30000)
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+from trajectories import TrajectoryRecorder, TrajectoryReader
+import mcs_batch
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+class TestTrajectories(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'store')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record(self):
+        with TrajectoryRecorder(self.path, 3, chunk_rows=500) as recorder:
+            results = mcs_batch.run_batch(3000, 'once', np.random.default_rng(2), chunk_size=1000, recorder=recorder)
+        same = mcs_batch.run_batch(3000, 'once', np.random.default_rng(2), chunk_size=1000)
+        self.assertTrue((results == same).all())  # Recording does not change the simulation
+
+        reader = TrajectoryReader(self.path)
+        self.assertEqual(reader.trials, 3000)
+        self.assertEqual(reader.rows, results.sum())
+        self.assertEqual(reader['found'].sum(), 3000)
+        self.assertTrue(np.allclose(reader['posterior'][reader['step'] == 1], [0.2, 0.5, 0.3]))
+        last = reader['found']
+        self.assertTrue((reader['step'][last] == results[reader['trial'][last]]).all())
+
+    def test_many_areas(self):
+        areas = [(x, 0, x + 1, 2) for x in range(300)]  # 45150 menu options
+        with TrajectoryRecorder(self.path, 300) as recorder:
+            mcs_batch.run_batch(200, 'once', np.random.default_rng(3), areas=areas, priors=np.full(300, 1 / 300),
+                                recorder=recorder, cells=mcs_batch.area_cells(areas))
+        actions = TrajectoryReader(self.path)['action']
+        self.assertGreater(actions.max(), 32767)
+        self.assertTrue((actions > 300).all())  # Two different areas searched every day, never wrapped
+
+    def test_filter_and_aggregate(self):
+        with TrajectoryRecorder(self.path, 3) as recorder:
+            results = mcs_batch.run_batch(2000, 'twice', np.random.default_rng(3), recorder=recorder)
+        reader = TrajectoryReader(self.path)
+        counts, means = reader.aggregate('step', 'found', chunk_rows=333)
+        self.assertEqual(counts[1], 2000)
+        self.assertEqual(counts.tolist()[1:], [(results >= s).sum() for s in range(1, results.max() + 1)])
+        _, posterior = reader.aggregate('action', 'posterior', lambda c: c['step'] == 1, chunk_rows=333)
+        self.assertTrue(np.allclose(posterior[2], [0.2, 0.5, 0.3]))  # First day searches area 2 twice
+        self.assertEqual(reader.trials_where(lambda c: c['step'] > 3, chunk_rows=333).tolist(),
+                         np.flatnonzero(results > 3).tolist())
+        rows = sum(len(c['trial']) for c in reader.filter(lambda c: c['sailor_area'] == 0, ['trial'], 333))
+        self.assertEqual(rows, (reader['sailor_area'] == 0).sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+from variance import VarianceReducedScenarios, area_probabilities, compare
+import mcs_batch
+import unittest
+import numpy as np
+
+
+class TestVariance(unittest.TestCase):
+
+    def test_area_probabilities(self):
+        self.assertTrue(np.allclose(area_probabilities(3), [2 / 9, 5 / 9, 2 / 9]))
+        area, _ = mcs_batch.place_sailors(100000, np.random.default_rng(0), np.full(4, 10))
+        self.assertTrue(np.allclose(np.bincount(area) / 100000, area_probabilities(4), atol=0.01))
+
+    def test_scenarios(self):
+        seed_seq = np.random.SeedSequence(5)
+        plain = VarianceReducedScenarios(1000, seed_seq)
+        self.assertTrue(np.allclose(np.bincount(plain.area) / 1000, area_probabilities(3), atol=0.05))
+        pairs = VarianceReducedScenarios(1000, seed_seq, antithetic=True)
+        sep = pairs.effectiveness(1, np.arange(1000))
+        self.assertTrue(np.allclose(sep[:500] + sep[500:], 1.1))
+        self.assertTrue(((pairs.loc >= 0) & (pairs.loc < pairs.cells[pairs.area])).all())
+        strata = VarianceReducedScenarios(900, seed_seq, stratified=True)
+        self.assertEqual(np.bincount(strata.area).tolist(), [200, 500, 200])
+        with self.assertRaises(ValueError):
+            VarianceReducedScenarios(999, seed_seq, antithetic=True)
+
+    def test_scenario_options(self):
+        seed_seq = np.random.SeedSequence(6)
+        scenarios = VarianceReducedScenarios(1000, seed_seq, antithetic=True, effectiveness=(0.5, 0.6), sailor_mode=1)
+        sep = scenarios.effectiveness(1, np.arange(1000))
+        self.assertTrue(((sep >= 0.5) & (sep <= 0.6)).all())
+        self.assertTrue(np.allclose(np.bincount(scenarios.area, minlength=3) / 1000, area_probabilities(3, 1),
+                                    atol=0.05))
+        strata = VarianceReducedScenarios(900, seed_seq, stratified=True, sailor_mode=1)
+        self.assertEqual(np.bincount(strata.area).tolist(), [500, 300, 100])
+
+    def test_compare(self):
+        comparison = compare({'once': 'once', 'twice': 'twice'}, 20000, seed=1, antithetic=True, stratified=True)
+        once, twice = comparison.estimates['once'], comparison.estimates['twice']
+        self.assertAlmostEqual(once.mean, 1.88, delta=0.05)
+        self.assertGreater(once.variance_reduction, 1)
+        difference = comparison.differences['twice']
+        self.assertAlmostEqual(difference.mean, twice.mean - once.mean)
+        self.assertGreater(difference.variance_reduction, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
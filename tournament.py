@@ -0,0 +1,89 @@
+"""Compare search policies on the same simulated scenarios and stop as soon as the ranking is clear.
+Replaces rerunning bayes_rule_MCS with one policy at a time for a fixed number of trials."""
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+
+import mcs_batch
+
+Standing = namedtuple('Standing', 'name mean half_width')
+TournamentResult = namedtuple('TournamentResult', 'standings trials settled')
+
+
+class _Moments:
+    """Running count, mean and sum of squared deviations, updated with whole batches."""
+
+    def __init__(self, shape=()):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def add(self, batch):
+        """Add batch of values, batch has the trials on axis 0."""
+        n = len(batch)
+        mean = batch.mean(axis=0)
+        delta = mean - self.mean
+        total = self.count + n
+        self.m2 = self.m2 + ((batch - mean) ** 2).sum(axis=0) + delta ** 2 * self.count * n / total
+        self.mean = self.mean + delta * n / total
+        self.count = total
+
+    def half_width(self, z):
+        """Return half width of the confidence interval of the mean."""
+        if self.count < 2:
+            return np.full(np.shape(self.mean), np.inf)
+        return z * np.sqrt(self.m2 / (self.count - 1) / self.count)
+
+
+def run_tournament(policies, seed=None, batch_size=10_000, max_trials=1_000_000, min_trials=20_000,
+                   confidence=0.95, areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS, cells=None):
+    """Rank policies by average number of searches needed to find the sailor.
+
+    policies maps names to batch policies (a name from mcs_batch.POLICIES or a function taking
+    an (N, areas) probability array and a Generator). Every batch of trials is played by all policies
+    on the same PairedScenarios. The tournament stops when the confidence interval of the paired
+    difference between the leader and every other policy excludes zero, or after max_trials.
+    cells are the searchable cells per area, water cells by default.
+    """
+    cells = mcs_batch.scenario_cells(areas, cells)
+    names = list(policies)
+    k = len(names)
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2 / max(k - 1, 1))  # Bonferroni over leader comparisons
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    means = _Moments(k)
+    diffs = _Moments((k, k))  # diffs.mean[i, j] is the mean of results of policy i minus policy j
+    settled = False
+    batch = 0
+    while means.count < max_trials and not settled:
+        n = min(batch_size, max_trials - means.count)
+        scenario_seq, policy_seq = np.random.SeedSequence(seed_seq.entropy,
+                                                          spawn_key=seed_seq.spawn_key + (batch,)).spawn(2)
+        scenarios = mcs_batch.PairedScenarios(n, scenario_seq, areas, cells=cells)
+        rngs = [np.random.default_rng(s) for s in policy_seq.spawn(k)]
+        results = np.column_stack([mcs_batch.simulate(scenarios, policies[name], rng, priors)
+                                   for name, rng in zip(names, rngs)]).astype(float)
+        means.add(results)
+        diffs.add(results[:, :, None] - results[:, None, :])
+        batch += 1
+
+        leader = int(np.argmin(means.mean))
+        others = [i for i in range(k) if i != leader]
+        low = diffs.mean[others, leader] - diffs.half_width(z)[others, leader]
+        settled = means.count >= min_trials and bool((low > 0).all())
+
+    half_widths = means.half_width(z)
+    standings = sorted((Standing(name, float(means.mean[i]), float(half_widths[i])) for i, name in enumerate(names)),
+                       key=lambda s: s.mean)
+    return TournamentResult(standings, means.count, settled)
+
+
+def main():
+    result = run_tournament({'once': 'once', 'twice': 'twice'})
+    for place, standing in enumerate(result.standings, start=1):
+        print(f'{place}. {standing.name}: Average: {standing.mean:.4f} +/- {standing.half_width:.4f}')
+    print(f'Trials: {result.trials}, ranking settled: {result.settled}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Per-day records of simulated searches, stored column by column in files that are memory-mapped for reading.
+
+A trajectory store is a directory with one raw binary file per column and meta.json with the
+dtype and width of every column and the number of rows. Every row is one search day of one trial:
+
+    trial        trial id, counted over everything written to the store
+    step         search day, from 1
+    action       menu option chosen by the policy
+    effectiveness  search effectiveness of every area drawn for the day
+    posterior    target probabilities the policy chose from
+    found        True on the day the sailor was found, which is the last row of the trial
+    sailor_area  0-based area of the sailor
+    sailor_loc   cell of the sailor in the order cells are searched
+"""
+import json
+import os
+
+import numpy as np
+
+META_FILE = 'meta.json'
+CHUNK_ROWS = 1 << 20  # Rows buffered in memory before they are appended to the column files
+
+
+def _columns(num_areas):
+    """Return column name -> (dtype, width), width 0 for one value per row."""
+    return {
+        'trial': ('int64', 0),
+        'step': ('int32', 0),
+        'action': ('int32', 0),  # Menu options grow as N (N + 1) / 2 with N areas
+        'effectiveness': ('float32', num_areas),
+        'posterior': ('float32', num_areas),
+        'found': ('bool', 0),
+        'sailor_area': ('int16', 0),
+        'sailor_loc': ('int32', 0),
+    }
+
+
+class TrajectoryRecorder:
+    """Append search days of simulated trials to a trajectory store in chunks of chunk_rows.
+
+    Pass it as recorder to mcs_batch.simulate or mcs_batch.run_batch. Use as a context manager
+    or call close() so that the last chunk and meta.json are written.
+    """
+
+    def __init__(self, path, num_areas, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.columns = _columns(num_areas)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self.trials = 0
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered = 0
+        os.makedirs(path, exist_ok=True)
+        for name in self.columns:
+            open(os.path.join(path, f'{name}.bin'), 'wb').close()
+
+    def start_trials(self, n):
+        """Reserve ids for n new trials, return the id of the first one."""
+        first = self.trials
+        self.trials += n
+        return first
+
+    def record(self, **values):
+        """Add one day of many trials, values has an array for every column."""
+        for name, (dtype, _) in self.columns.items():
+            self._buffer[name].append(np.asarray(values[name], dtype=dtype))
+        self._buffered += len(values['trial'])
+        if self._buffered >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Append buffered rows to the column files."""
+        for name, parts in self._buffer.items():
+            if parts:
+                with open(os.path.join(self.path, f'{name}.bin'), 'ab') as f:
+                    np.concatenate(parts).tofile(f)
+            parts.clear()
+        self.rows += self._buffered
+        self._buffered = 0
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump({'rows': self.rows, 'trials': self.trials, 'columns': self.columns}, f, indent=2)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """Read a trajectory store through memory maps, a chunk of rows at a time."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.trials = meta['trials']
+        self.columns = {}
+        for name, (dtype, width) in meta['columns'].items():
+            shape = (self.rows, width) if width else (self.rows,)
+            file = os.path.join(path, f'{name}.bin')
+            self.columns[name] = np.memmap(file, dtype=dtype, mode='r', shape=shape) if self.rows else \
+                np.empty(shape, dtype=dtype)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def chunks(self, names=None, chunk_rows=CHUNK_ROWS):
+        """Yield dicts of column name -> array for consecutive chunks of rows."""
+        names = names or list(self.columns)
+        for start in range(0, self.rows, chunk_rows):
+            yield {name: np.asarray(self.columns[name][start:start + chunk_rows]) for name in names}
+
+    def filter(self, predicate, names=None, chunk_rows=CHUNK_ROWS):
+        """Yield chunks with only the rows where predicate(chunk) is True.
+
+        predicate gets a chunk with all columns and returns a boolean array of its rows.
+        """
+        for chunk in self.chunks(None, chunk_rows):
+            keep = predicate(chunk)
+            yield {name: chunk[name][keep] for name in (names or chunk)}
+
+    def aggregate(self, by, name, predicate=None, chunk_rows=CHUNK_ROWS):
+        """Return counts and means of column name for every value of integer column by, from 0 to its maximum.
+
+        Means of columns with one value per area are returned per area. Only rows where predicate
+        is True are used when a predicate is given.
+        """
+        counts = np.zeros(0, dtype=np.int64)
+        sums = np.zeros((0,) + self.columns[name].shape[1:])
+        for chunk in self.chunks(None, chunk_rows):
+            keys, values = chunk[by], chunk[name].astype(float)
+            if predicate is not None:
+                keep = predicate(chunk)
+                keys, values = keys[keep], values[keep]
+            if len(keys) == 0:
+                continue
+            size = max(len(counts), int(keys.max()) + 1)
+            counts = np.pad(counts, (0, size - len(counts)))
+            sums = np.pad(sums, [(0, size - len(sums))] + [(0, 0)] * (sums.ndim - 1))
+            counts += np.bincount(keys, minlength=size)
+            np.add.at(sums, keys, values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts.reshape((-1,) + (1,) * (sums.ndim - 1))
+        return counts, means
+
+    def trials_where(self, predicate, chunk_rows=CHUNK_ROWS):
+        """Return sorted ids of trials with at least one row where predicate is True."""
+        ids = [chunk['trial'] for chunk in self.filter(predicate, ['trial'], chunk_rows)]
+        return np.unique(np.concatenate(ids)) if ids else np.zeros(0, dtype=np.int64)
@@ -0,0 +1,141 @@
+"""Variance reduction for comparing search policies: common random numbers, antithetic pairs and
+stratified sailor areas. Every estimate reports how many times smaller its variance is than the
+variance of plain Monte Carlo with the same number of trials."""
+from collections import namedtuple
+
+import numpy as np
+
+import mcs_batch
+
+Estimate = namedtuple('Estimate', 'mean std_error variance_reduction')
+Comparison = namedtuple('Comparison', 'estimates differences')
+
+
+def area_probabilities(num_areas, mode=None):
+    """Return probability that the sailor is placed in every area by place_sailors (triangular distribution)."""
+    a, c, b = 1, (num_areas + 2) / 2 if mode is None else mode, num_areas + 1
+    x = np.arange(1, num_areas + 1, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):  # Only one side exists when the mode is at an end
+        cdf = np.where(x < c, (x - a) ** 2 / ((b - a) * (c - a)), 1 - (b - x) ** 2 / ((b - a) * (b - c)))
+    return np.diff(np.append(cdf, 1.0))  # The last area also gets the values capped by place_sailors
+
+
+def _triangular_areas(u, num_areas, mode=None):
+    """Return 0-based sailor areas for uniform numbers u, by the inverse of the triangular distribution."""
+    a, c, b = 1, (num_areas + 2) / 2 if mode is None else mode, num_areas + 1
+    x = np.where(u < (c - a) / (b - a), a + np.sqrt(u * (b - a) * (c - a)), b - np.sqrt((1 - u) * (b - a) * (b - c)))
+    return np.minimum(x.astype(np.int64), num_areas) - 1
+
+
+def _stratified_areas(n, probabilities):
+    """Return 0-based areas of n trials allocated to areas in proportion to probabilities (largest remainder)."""
+    quota = n * probabilities
+    counts = np.floor(quota).astype(np.int64)
+    counts[np.argsort(counts - quota, kind='stable')[:n - counts.sum()]] += 1
+    return np.repeat(np.arange(len(probabilities)), counts)
+
+
+class VarianceReducedScenarios(mcs_batch.PairedScenarios):
+    """PairedScenarios with antithetic pairs and stratified sailor areas as options.
+
+    All random numbers are uniforms of the streams of PairedScenarios, so every policy simulated on
+    the same scenarios meets the same sailors and search effectiveness (common random numbers).
+    With antithetic, trial i + n / 2 uses 1 - u for every uniform u of trial i. With stratified,
+    the number of trials with the sailor in every area is fixed in proportion to area_probabilities.
+    """
+
+    def __init__(self, n, seed_seq, areas=mcs_batch.SEARCH_AREAS, antithetic=False, stratified=False,
+                 effectiveness=mcs_batch.EFFECTIVENESS, sailor_mode=None, cells=None):
+        if antithetic and n % 2:
+            raise ValueError(f'Antithetic pairs need an even number of trials, not {n}')
+        self.n = n
+        self.seed_seq = seed_seq
+        self.cells = mcs_batch.scenario_cells(areas, cells)  # Water cells by default
+        self.effectiveness_range = effectiveness
+        self.sailor_mode = sailor_mode
+        self.antithetic = antithetic
+        self.stratified = stratified
+        self.units = n // 2 if antithetic else n  # Independent samples, an antithetic pair is one
+
+        num_areas = len(self.cells)
+        rng = np.random.default_rng(self._stream(0))
+        u_area, u_cell = rng.random(self.units), rng.random(self.units)
+        if stratified:
+            area = rng.permutation(_stratified_areas(self.units, area_probabilities(num_areas, sailor_mode)))
+            self.area = np.concatenate([area, area]) if antithetic else area
+        else:
+            self.area = _triangular_areas(np.concatenate([u_area, 1 - u_area]) if antithetic else u_area, num_areas,
+                                          sailor_mode)
+        u_cell = np.concatenate([u_cell, 1 - u_cell]) if antithetic else u_cell
+        self.loc = np.minimum((u_cell * self.cells[self.area]).astype(np.int64), self.cells[self.area] - 1)
+
+    def effectiveness(self, day, trials):
+        u = np.random.default_rng(self._stream(day)).random((self.units, len(self.cells)))
+        if self.antithetic:
+            u = np.concatenate([u, 1 - u])
+        low, high = self.effectiveness_range
+        return (low + (high - low) * u)[trials]  # Uniform like calc_search_effectiveness
+
+    def estimate(self, values, plain_variance=None):
+        """Return Estimate of the mean of per-trial values simulated on these scenarios.
+
+        plain_variance is the variance of one trial under plain Monte Carlo, by default the sample
+        variance of values.
+        """
+        values = np.asarray(values, dtype=float)
+        if plain_variance is None:
+            plain_variance = values.var(ddof=1)
+        units = (values[:self.units] + values[self.units:]) / 2 if self.antithetic else values
+        if self.stratified:
+            strata = self.area[:self.units]
+            weights = area_probabilities(len(self.cells), self.sailor_mode)
+        else:
+            strata = np.zeros(self.units, dtype=np.int64)
+            weights = np.ones(1)
+        mean = variance = 0.0
+        for stratum, weight in enumerate(weights):
+            members = units[strata == stratum]
+            if len(members) == 0:
+                continue
+            mean += weight * members.mean()
+            if len(members) > 1:
+                variance += weight ** 2 * members.var(ddof=1) / len(members)
+        reduction = plain_variance / self.n / variance if variance > 0 else np.inf
+        return Estimate(float(mean), float(np.sqrt(variance)), float(reduction))
+
+
+def compare(policies, num_trials=20_000, seed=None, antithetic=False, stratified=False,
+            areas=mcs_batch.SEARCH_AREAS, priors=mcs_batch.PRIORS, effectiveness=mcs_batch.EFFECTIVENESS,
+            sailor_mode=None, cells=None):
+    """Simulate policies on common scenarios, return Comparison of their means and of differences to the first policy.
+
+    The variance reduction of a difference is relative to two independent plain runs of num_trials each.
+    """
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    scenario_seq, policy_seq = seed_seq.spawn(2)
+    scenarios = VarianceReducedScenarios(num_trials, scenario_seq, areas, antithetic, stratified, effectiveness,
+                                         sailor_mode, cells)
+    names = list(policies)
+    results = {name: mcs_batch.simulate(scenarios, policies[name], np.random.default_rng(rng_seq), priors).astype(float)
+               for name, rng_seq in zip(names, policy_seq.spawn(len(names)))}
+    estimates = {name: scenarios.estimate(values) for name, values in results.items()}
+    first = results[names[0]]
+    differences = {name: scenarios.estimate(results[name] - first, first.var(ddof=1) + results[name].var(ddof=1))
+                   for name in names[1:]}
+    return Comparison(estimates, differences)
+
+
+def main(num_trials=20_000):
+    for antithetic, stratified in ((False, False), (True, False), (False, True), (True, True)):
+        comparison = compare({'once': 'once', 'twice': 'twice'}, num_trials, 0, antithetic, stratified)
+        twice = comparison.differences['twice']
+        print(f'Antithetic: {antithetic}, stratified: {stratified}')
+        for name, estimate in comparison.estimates.items():
+            print(f'  {name}: Average: {estimate.mean:.4f} +/- {estimate.std_error:.4f} '
+                  f'(variance reduction {estimate.variance_reduction:.2f}x)')
+        print(f'  twice - once: {twice.mean:.4f} +/- {twice.std_error:.4f} '
+              f'(variance reduction {twice.variance_reduction:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()